@@ -0,0 +1,250 @@
+"""
+Render report figures without dialogs or prompts, from a JSON job file:
+
+{
+  "output_dir": "figures",                 (relative paths: next to the job file)
+  "formats": ["png", "pdf"],               (png / pdf / svg)
+  "dpi": 150,
+  "presentation": true,
+  "downcast": true,                        (float32 data, see csv_loader.downcast_frame)
+  "figures": [
+    {
+      "name": "pressure_runs",
+      "files": ["data/run1.csv", "data/run2.csv"],   (glob patterns allowed)
+      "sep": ";",
+      "x": "crank",
+      "left": ["Pressure"],
+      "right": ["HRR"],                    (optional, dual y axis)
+      "legends": ["Run 1", "Run 2"],       (optional, one per plotted line)
+      "x_label": "Crank angle [deg]",
+      "left_label": "Pressure", "left_units": "bar",
+      "right_label": "Heat release rate", "right_units": "J/deg",
+      "title": "Cylinder pressure",
+      "interpolate": true                  (put files 2..n on file 1's x grid)
+    }
+  ]
+}
+
+Any top-level key other than "figures" is a default for every figure.
+"""
+import os
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import matplotlib
+matplotlib.use("Agg")   # no display needed (compute nodes, ssh, CI)
+import matplotlib.pyplot as plt
+
+import csv_loader
+from csv_loader import read_csv_cached
+from resampling import resample_onto_grid
+from decimation import decimate
+
+# ====== SETTINGS ======
+NUM_WORKERS = os.cpu_count()             # 1 = sequential, in this process
+OUTPUT_DIR = "figures"
+FORMATS = ["png"]
+SUPPORTED_FORMATS = ("png", "pdf", "svg")
+DPI = 150
+FIGSIZE = (12, 7)
+PRESENTATION = True                      # thicker lines and larger fonts
+INTERPOLATION_METHOD = "linear"          # 'linear', 'nearest' or 'cubic'
+DECIMATION_POINTS = 4000                 # None = draw every sample
+DECIMATION_METHOD = "minmax"
+# =======================
+
+PRESENTATION_RC = {
+    'axes.labelsize': 16,
+    'xtick.labelsize': 14,
+    'ytick.labelsize': 14,
+    'legend.fontsize': 14,
+    'axes.titlesize': 18,
+}
+
+
+def load_jobs(job_path):
+    """Read the job file and return one fully resolved spec per figure."""
+    with open(job_path, "r", encoding="utf-8") as f:
+        job = json.load(f)
+
+    base_dir = os.path.dirname(os.path.abspath(job_path))
+    defaults = {k: v for k, v in job.items() if k != "figures"}
+    specs = []
+    for i, figure in enumerate(job.get("figures", [])):
+        spec = {**defaults, **figure}
+        spec.setdefault("name", f"figure_{i + 1:03d}")
+        files = spec["files"] if isinstance(spec["files"], list) else [spec["files"]]
+        resolved = []
+        for pattern in files:
+            pattern = os.path.join(base_dir, pattern)
+            resolved.extend(sorted(glob.glob(pattern)) or [pattern])   # no match: fail on read
+        spec["files"] = resolved
+        spec["output_dir"] = os.path.join(base_dir, spec.get("output_dir", OUTPUT_DIR))
+        formats = spec.get("formats", FORMATS)
+        spec["formats"] = [formats] if isinstance(formats, str) else list(formats)
+        bad = [fmt for fmt in spec["formats"] if fmt not in SUPPORTED_FORMATS]
+        if bad:
+            raise ValueError(f"{spec['name']}: unsupported format(s) {bad}, use {SUPPORTED_FORMATS}")
+        specs.append(spec)
+    return specs
+
+
+def axis_label(label, units):
+    return f"{label} [{units}]" if units else label
+
+
+def load_series(spec):
+    """
+    (x, y, column, file, side) for every line of the figure; with
+    'interpolate', files 2..n are resampled onto file 1's x grid.
+    """
+    x_col = spec["x"]
+    left, right = spec.get("left", []), spec.get("right", [])
+    interpolate = spec.get("interpolate", True) and len(spec["files"]) > 1
+    method = spec.get("interpolation", INTERPOLATION_METHOD)
+
+    series = []
+    x_base = None
+    for path in spec["files"]:
+        df = read_csv_cached(path, usecols=[x_col, *left, *right], downcast=spec.get("downcast"),
+                             sep=spec.get("sep", ","))
+        x = df[x_col].to_numpy()
+        columns = [(col, "left") for col in left] + [(col, "right") for col in right]
+        if interpolate and x_base is not None:
+            ys = resample_onto_grid(x_base, [(x, df[col].to_numpy()) for col, _ in columns], method)
+            x = x_base
+        else:
+            ys = [df[col].to_numpy() for col, _ in columns]
+            x_base = x if x_base is None else x_base
+        for (col, side), y in zip(columns, ys):
+            series.append((x, y, col, path, side))
+    return series
+
+
+def render_figure(spec):
+    """Draw one figure and save it in every requested format; returns the written paths."""
+    series = load_series(spec)
+    legends = spec.get("legends")
+    if legends is not None and len(legends) != len(series):
+        raise ValueError(f"{len(legends)} legends given for {len(series)} lines")
+    multiple_files = len(spec["files"]) > 1
+    presentation = spec.get("presentation", PRESENTATION)
+    points = spec.get("decimation_points", DECIMATION_POINTS)
+
+    with plt.rc_context(PRESENTATION_RC if presentation else {}):
+        fig, ax1 = plt.subplots(figsize=tuple(spec.get("figsize", FIGSIZE)))
+        ax2 = ax1.twinx() if any(side == "right" for *_, side in series) else None
+        line_width = 2.5 if presentation else 2.0
+        colors = plt.cm.tab10.colors
+
+        for i, (x, y, col, path, side) in enumerate(series):
+            if points:
+                x, y = decimate(x, y, points, spec.get("decimation_method", DECIMATION_METHOD))
+            if legends is not None:
+                label = legends[i]
+            elif multiple_files:
+                label = f"{col} ({os.path.splitext(os.path.basename(path))[0]})"
+            else:
+                label = col
+            ax = ax2 if side == "right" else ax1
+            ax.plot(x, y, label=label, linewidth=line_width, color=colors[i % len(colors)],
+                    linestyle='--' if side == "right" else '-')
+
+        ax1.set_xlabel(spec.get("x_label", spec["x"]))
+        ax1.set_ylabel(axis_label(spec.get("left_label", ", ".join(spec.get("left", []))), spec.get("left_units")))
+        if ax2:
+            ax2.set_ylabel(axis_label(spec.get("right_label", ", ".join(spec["right"])), spec.get("right_units")))
+        ax1.grid(True)
+
+        handles, labels = ax1.get_legend_handles_labels()
+        if ax2:
+            handles2, labels2 = ax2.get_legend_handles_labels()
+            handles += handles2
+            labels += labels2
+        ax1.legend(handles, labels)
+        if spec.get("title"):
+            ax1.set_title(spec["title"])
+        fig.tight_layout()
+
+        os.makedirs(spec["output_dir"], exist_ok=True)
+        written = []
+        for fmt in spec["formats"]:
+            out_path = os.path.join(spec["output_dir"], f"{spec['name']}.{fmt}")
+            fig.savefig(out_path, format=fmt, dpi=spec.get("dpi", DPI))
+            written.append(out_path)
+        plt.close(fig)
+    return written
+
+
+def _render_worker(spec):
+    """Run render_figure() and report (ok, reason, seconds) instead of raising."""
+    t0 = time.perf_counter()
+    try:
+        render_figure(spec)
+        ok, reason = True, ""
+    except Exception as e:
+        ok, reason = False, f"{type(e).__name__}: {e}"
+    return ok, reason, time.perf_counter() - t0
+
+
+def run_jobs(job_path, workers=NUM_WORKERS, only=None):
+    """
+    Render every figure of the job file (or only the named ones), spread
+    over `workers` processes, with per-figure render times and a summary.
+    """
+    specs = load_jobs(job_path)
+    if only:
+        specs = [s for s in specs if s["name"] in only]
+    if not specs:
+        print("No figures to render.")
+        return []
+    for spec in specs:
+        # explicit, so spawned workers (macOS/Windows) do not fall back to their own default
+        spec.setdefault("downcast", csv_loader.DOWNCAST)
+
+    t0 = time.perf_counter()
+    timings = []
+    failures = []
+
+    def finish(done, spec, ok, reason, seconds):
+        status = "ok" if ok else f"FAILED ({reason})"
+        print(f"[{done}/{len(specs)}] {spec['name']}: {status}, {seconds:.2f} s")
+        timings.append((seconds, spec["name"]))
+        if not ok:
+            failures.append((spec["name"], reason))
+
+    if workers is None or workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_render_worker, spec): spec for spec in specs}
+            for done, future in enumerate(as_completed(futures), start=1):
+                finish(done, futures[future], *future.result())
+    else:
+        for done, spec in enumerate(specs, start=1):
+            finish(done, spec, *_render_worker(spec))
+
+    elapsed = max(time.perf_counter() - t0, 1e-9)
+    render_total = sum(seconds for seconds, _ in timings)
+    print("\n====== SUMMARY ======")
+    print(f"Rendered: {len(specs) - len(failures)}, failed: {len(failures)}")
+    print(f"Elapsed: {elapsed:.2f} s, {len(specs) / elapsed:.2f} figures/s "
+          f"(render time {render_total:.2f} s, mean {render_total / len(specs):.2f} s/figure)")
+    print("Slowest: " + ", ".join(f"{name} {seconds:.2f} s" for seconds, name in sorted(timings, reverse=True)[:5]))
+    for name, reason in failures:
+        print(f"  FAILED {name}: {reason}")
+    return failures
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render figures headless from a JSON job file.")
+    parser.add_argument("job", help="JSON job file")
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS, help="number of worker processes")
+    parser.add_argument("--only", nargs="+", metavar="NAME", help="render only these figures")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_jobs(args.job, workers=args.workers, only=args.only)
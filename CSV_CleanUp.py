@@ -2,6 +2,30 @@ import pandas as pd
 from tkinter import Tk
 from tkinter.filedialog import askopenfilename, asksaveasfilename
 
+# === SWITCHES ===
+stream_in_chunks = True   # If True, copy only the kept columns in fixed-size chunks (low memory)
+CHUNK_SIZE = 100_000      # rows per chunk in streaming mode
+
+
+def copy_columns_in_chunks(csv_file, save_path, columns, chunk_size=CHUNK_SIZE):
+    """
+    Copy only `columns` from csv_file to save_path, chunk by chunk.
+    Only the kept columns are parsed (usecols), so peak memory depends on
+    chunk_size and the number of kept columns, not on the file size.
+    """
+    reader = pd.read_csv(csv_file, usecols=columns, chunksize=chunk_size)
+    rows = 0
+    for i, chunk in enumerate(reader):
+        # usecols does not preserve the requested order
+        chunk[columns].to_csv(save_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+        rows += len(chunk)
+
+    if rows == 0:
+        # header-only input: still write the header
+        pd.DataFrame(columns=columns).to_csv(save_path, index=False)
+    return rows
+
+
 def delete_selected_columns():
     # Hide Tkinter root window
     root = Tk()
@@ -13,7 +37,11 @@ def delete_selected_columns():
         print("No file selected.")
         return
 
-    df = pd.read_csv(csv_file)
+    if stream_in_chunks:
+        # Header only, the data is read later in chunks
+        df = pd.read_csv(csv_file, nrows=0)
+    else:
+        df = pd.read_csv(csv_file)
 
     # Display columns with indices
     print("\nAvailable columns:")
@@ -32,16 +60,22 @@ def delete_selected_columns():
 
     columns_to_delete = [df.columns[i] for i in indices]
     print(f"\nDeleting columns: {columns_to_delete}")
-    df_cleaned = df.drop(columns=columns_to_delete)
 
     # Save cleaned file
     print("\nSelect where to save the cleaned CSV...")
     save_path = asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
-    if save_path:
+    if not save_path:
+        print("Save canceled.")
+        return
+
+    if stream_in_chunks:
+        columns_to_keep = [col for col in df.columns if col not in columns_to_delete]
+        rows = copy_columns_in_chunks(csv_file, save_path, columns_to_keep)
+        print(f"Cleaned file saved to: {save_path} ({rows} rows)")
+    else:
+        df_cleaned = df.drop(columns=columns_to_delete)
         df_cleaned.to_csv(save_path, index=False)
         print(f"Cleaned file saved to: {save_path}")
-    else:
-        print("Save canceled.")
 
 if __name__ == "__main__":
-    delete_selected_columns()
\ No newline at end of file
+    delete_selected_columns()
@@ -1,7 +1,191 @@
+import ast
+import os
+import re
+import numpy as np
 import pandas as pd
 from tkinter import Tk
 from tkinter.filedialog import askopenfilename, asksaveasfilename
 
+from csv_loader import iter_numeric_chunks
+
+# === SETTINGS ===
+CHUNK_SIZE = 500_000   # rows per chunk in expression mode
+NUMERIC_MMAP = False   # expression mode: read all-numeric files through the memory-mapped .npy cache
+
+# Functions and constants allowed in formulas
+FORMULA_FUNCTIONS = {
+    name: getattr(np, name) for name in (
+        "sqrt", "exp", "log", "log10", "log2", "abs", "sin", "cos", "tan",
+        "arcsin", "arccos", "arctan", "arctan2", "sinh", "cosh", "tanh",
+        "deg2rad", "rad2deg", "minimum", "maximum", "power", "square", "sign",
+        "floor", "ceil", "hypot",
+    )
+}
+FORMULA_FUNCTIONS["where"] = np.where
+FORMULA_CONSTANTS = {"pi": np.pi, "e": np.e}
+
+_BINARY_UFUNCS = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply,
+    ast.Div: np.true_divide, ast.Pow: np.power, ast.Mod: np.mod,
+    ast.Gt: np.greater, ast.GtE: np.greater_equal, ast.Lt: np.less, ast.LtE: np.less_equal,
+}
+
+
+def parse_formulas(lines, columns):
+    """
+    Parse 'name = expression' lines into [(name, ast expression)].
+    Column names that are not identifiers are written in backticks,
+    e.g. `Mass Cylinder 1 (kg)` * 1e6. Later formulas may use earlier names.
+    """
+    formulas = []
+    known = set(columns)
+    aliases = {}
+    for line in lines:
+        name, sep, expr = line.partition("=")
+        name = name.strip().strip("`")
+        if not sep or not name or not expr.strip():
+            raise ValueError(f"Expected 'name = expression', got: {line!r}")
+
+        def alias(match):
+            alias_name = f"__col{len(aliases)}__"
+            aliases[alias_name] = match.group(1)
+            return alias_name
+        tree = ast.parse(re.sub(r"`([^`]+)`", alias, expr.strip()), mode="eval").body
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name):
+                node.id = aliases.get(node.id, node.id)
+                if node.id not in known and node.id not in FORMULA_CONSTANTS and node.id not in FORMULA_FUNCTIONS:
+                    raise ValueError(f"Unknown column or name '{node.id}' in: {line!r}")
+            elif isinstance(node, ast.Call):
+                if not isinstance(node.func, ast.Name) or node.func.id not in FORMULA_FUNCTIONS or node.keywords:
+                    raise ValueError(f"Unsupported function call in: {line!r}")
+            elif isinstance(node, ast.Compare):
+                if len(node.ops) != 1 or type(node.ops[0]) not in _BINARY_UFUNCS:
+                    raise ValueError(f"Unsupported comparison in: {line!r}")
+            elif isinstance(node, ast.BinOp) and type(node.op) not in _BINARY_UFUNCS:
+                raise ValueError(f"Unsupported operator in: {line!r}")
+            elif not isinstance(node, (ast.Expression, ast.Constant, ast.Name, ast.Call, ast.BinOp,
+                                       ast.UnaryOp, ast.USub, ast.UAdd, ast.Compare, ast.Load)
+                                 + tuple(_BINARY_UFUNCS)):
+                raise ValueError(f"Unsupported syntax '{type(node).__name__}' in: {line!r}")
+
+        formulas.append((name, tree))
+        known.add(name)
+    return formulas
+
+
+def _evaluate(node, env):
+    """
+    Evaluate a formula tree on arrays. Returns (value, owned) where owned
+    means the array is a temporary of this evaluation, so the parent node
+    writes its result into it (out=) instead of allocating a new one.
+    """
+    if isinstance(node, ast.Constant):
+        return float(node.value), False
+    if isinstance(node, ast.Name):
+        if node.id in FORMULA_CONSTANTS:
+            return FORMULA_CONSTANTS[node.id], False
+        return env[node.id], False
+    if isinstance(node, ast.UnaryOp):
+        value, owned = _evaluate(node.operand, env)
+        if isinstance(node.op, ast.UAdd):
+            return value, owned
+        return _owned(np.negative(value, out=value if owned else None))
+
+    if isinstance(node, ast.BinOp):
+        ufunc, args = _BINARY_UFUNCS[type(node.op)], [node.left, node.right]
+    elif isinstance(node, ast.Compare):
+        ufunc, args = _BINARY_UFUNCS[type(node.ops[0])], [node.left, node.comparators[0]]
+    else:
+        ufunc, args = FORMULA_FUNCTIONS[node.func.id], node.args
+
+    values = [_evaluate(arg, env) for arg in args]
+    if isinstance(ufunc, np.ufunc) and ufunc.nout == 1:
+        # reuse the first temporary that can hold the result
+        out = next((v for v, owned in values if owned and v.dtype == np.float64), None)
+        if isinstance(node, ast.Compare):
+            out = None
+        return _owned(ufunc(*[v for v, _ in values], out=out))
+    return _owned(ufunc(*[v for v, _ in values]))
+
+
+def _owned(result):
+    # only full arrays can be written into; scalar results stay scalars
+    return result, isinstance(result, np.ndarray) and result.ndim > 0
+
+
+def evaluate_formulas(chunk, formulas):
+    """Add one column per formula to the chunk (vectorized, in order)."""
+    env = {}
+    for col in chunk.columns:
+        values = chunk[col].to_numpy()
+        env[col] = values.astype(np.float64, copy=False) if values.dtype.kind in "iub" else values
+    for name, tree in formulas:
+        value, _ = _evaluate(tree, env)
+        value = np.broadcast_to(value, (len(chunk),)) if np.ndim(value) == 0 else value
+        env[name] = value
+        chunk[name] = value
+    return chunk
+
+
+def apply_formulas_chunked(csv_file, save_path, formulas, chunk_size=CHUNK_SIZE):
+    """
+    Evaluate all formulas in one chunked read/write pass. If a chunk fails
+    (e.g. TypeError from -(a > 1)), the partial output is removed and a
+    ValueError says where.
+    """
+    if NUMERIC_MMAP:
+        chunks = iter_numeric_chunks(csv_file, chunk_size)
+    else:
+        chunks = pd.read_csv(csv_file, chunksize=chunk_size)
+    rows = 0
+    try:
+        for i, chunk in enumerate(chunks):
+            evaluate_formulas(chunk, formulas).to_csv(
+                save_path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+            rows += len(chunk)
+    except (TypeError, ValueError, ArithmeticError) as e:
+        if os.path.exists(save_path):
+            os.remove(save_path)
+        raise ValueError(f"evaluation failed in the chunk starting at row {rows}: "
+                         f"{type(e).__name__}: {e}") from e
+    return rows
+
+
+def expression_mode(csv_file, columns):
+    print("\nEnter formulas as 'name = expression', one per line (empty line to finish).")
+    print("Use `backticks` for column names with spaces, e.g. P_bar = `Pressure (Pa)` / 1e5")
+    lines = []
+    while True:
+        line = input("> ").strip()
+        if not line:
+            break
+        lines.append(line)
+
+    try:
+        formulas = parse_formulas(lines, columns)
+    except (ValueError, SyntaxError) as e:
+        print(f"Invalid formula: {e}")
+        return
+    if not formulas:
+        print("No formulas entered.")
+        return
+
+    print("\nSelect where to save the new CSV file...")
+    save_path = asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+    if not save_path:
+        print("Save canceled.")
+        return
+
+    try:
+        rows = apply_formulas_chunked(csv_file, save_path, formulas)
+    except ValueError as e:
+        print(f"Formulas not applied, {e}")
+        return
+    print(f"Derived {[name for name, _ in formulas]} for {rows} rows, saved to: {save_path}")
+
+
 def column_operation():
     # Hide the root window
     root = Tk()
@@ -13,7 +197,8 @@ def column_operation():
         print("No file selected.")
         return
 
-    df = pd.read_csv(csv_file)
+    # Header only; the data is read once the operation is known
+    df = pd.read_csv(csv_file, nrows=0)
 
     # Show available columns
     print("\nAvailable columns:")
@@ -24,7 +209,8 @@ def column_operation():
     print("1 = Add two columns")
     print("2 = Subtract column B from column A")
     print("3 = Multiply a column by a number")
-    choice = input("Enter operation number (1, 2, or 3): ")
+    print("4 = Evaluate named formulas in one chunked pass (expression mode)")
+    choice = input("Enter operation number (1, 2, 3 or 4): ")
 
     try:
         choice = int(choice)
@@ -32,6 +218,13 @@ def column_operation():
         print("Invalid choice.")
         return
 
+    if choice == 4:
+        expression_mode(csv_file, df.columns)
+        return
+
+    if choice in [1, 2, 3]:
+        df = pd.read_csv(csv_file)
+
     if choice in [1, 2]:
         col1_index = int(input("Enter the index of column A: "))
         col2_index = int(input("Enter the index of column B: "))
@@ -1,17 +1,23 @@
 
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from build_manifest import MANIFEST_NAME, load_manifest, needs_rebuild, record_build, save_manifest
 
-data_dir = Path("./data")
 
-for input_path in data_dir.glob("*.csv"):
+data_dir = Path("./data")
 
-    # Skip already processed files
-    if input_path.stem.endswith("_fixed"):
-        continue
+# === SWITCHES ===
+use_mmap_fast_path = True     # Byte-level, memory-mapped rewrite instead of line-by-line
+NUM_WORKERS = os.cpu_count()  # Process pool size for the fast path
+BLOCK_BYTES = 8 * 1024 * 1024  # Fast path: bytes processed at a time (bounds the temporaries)
+incremental_build = True      # Only process new or modified files (see build_manifest.py)
 
-    output_path = input_path.with_name(input_path.stem + "_fixed.csv")
 
+def fix_file_lines(input_path, output_path):
     with open(input_path, "r", encoding="utf-8") as fin, \
          open(output_path, "w", encoding="utf-8") as fout:
 
@@ -28,6 +34,161 @@ for input_path in data_dir.glob("*.csv"):
 
             fout.write(line)
 
-    print(f"Fixed: {input_path.name} → {output_path.name}")
 
-print("Done. All CSV files processed.")
+def _line_boundary(mm, start, end, size, block_bytes):
+    """First position after the last line end in mm[start:end] (grown if a line is longer)."""
+    while end < size:
+        p = max(mm.rfind(b"\n", start, end), mm.rfind(b"\r", start, end))
+        if p >= 0:
+            # keep a '\r\n' pair in one block
+            return p + 2 if mm[p] == ord("\r") and p + 1 < size and mm[p + 1] == ord("\n") else p + 1
+        end = min(end + block_bytes, size)
+    return size
+
+
+def _fix_block(block, first_line):
+    """
+    Fix the whole lines in `block` ('\n' line ends); first_line is the
+    file line number of its first line. Returns (bytes, newline count).
+    """
+    import numpy as np
+
+    buf = np.frombuffer(block, dtype=np.uint8).copy()
+    newlines = np.flatnonzero(buf == ord("\n"))
+    commas = np.flatnonzero(buf == ord(","))
+
+    # Line number of every comma, and the second comma of each line
+    line_of_comma = np.searchsorted(newlines, commas)
+    is_second = np.zeros(len(commas), dtype=bool)
+    is_second[1:] = line_of_comma[1:] == line_of_comma[:-1]
+    is_second[2:] &= line_of_comma[2:] != line_of_comma[:-2]
+    buf[commas[is_second]] = ord(".")
+
+    # Skip the second row of the file
+    skip = 1 - first_line
+    if 0 <= skip <= len(newlines):
+        row_start = newlines[skip - 1] + 1 if skip > 0 else 0
+        row_end = newlines[skip] + 1 if skip < len(newlines) else len(buf)
+        buf = np.concatenate((buf[:row_start], buf[row_end:]))
+    return buf.tobytes(), len(newlines)
+
+
+def fix_file_mmap(input_path, output_path, block_bytes=BLOCK_BYTES):
+    """
+    Same result as fix_file_lines(), byte for byte, but done in bulk on the
+    raw bytes: the memory-mapped file is processed in blocks of about
+    block_bytes, split at line ends, and the second comma of every line is
+    located with vectorized position arithmetic. Memory use depends on the
+    block size, not on the file size.
+    """
+    with open(input_path, "rb") as fin, open(output_path, "wb") as fout:
+        size = os.fstat(fin.fileno()).st_size
+        if size == 0:
+            return 0
+        with mmap.mmap(fin.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start, line = 0, 0
+            while start < size:
+                end = _line_boundary(mm, start, min(start + block_bytes, size), size, block_bytes)
+                block = mm[start:end]
+
+                # Text mode reads universal newlines and writes os.linesep
+                if b"\r" in block:
+                    block = block.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+                out, n_lines = _fix_block(block, line)
+                if os.linesep != "\n":
+                    out = out.replace(b"\n", os.linesep.encode())
+                fout.write(out)
+
+                line += n_lines
+                start = end
+    return size
+
+
+def read_decimal_comma_csv(input_path, encoding="utf-8"):
+    """
+    Read a two-column file with a units row and decimal-comma values
+    (e.g. '-360,0,00082945') straight into float64 columns, without
+    writing a _fixed.csv first.
+
+    The same rule as the fixer applies: the first field is the first column,
+    the rest of the line (second comma = decimal point) is the second one.
+    Units are returned in df.attrs["units"], e.g. {"CRANKANGLE": "deg"}.
+    """
+    import numpy as np
+    import pandas as pd
+
+    with open(input_path, "r", encoding=encoding) as fin:
+        names = fin.readline().rstrip("\r\n").split(",")
+        units = fin.readline().rstrip("\r\n").split(",")
+
+    if len(names) != 2:
+        raise ValueError(f"{input_path}: expected 2 columns, found {len(names)}")
+
+    raw = pd.read_csv(input_path, header=None, skiprows=2, names=["x", "int", "frac"],
+                      dtype={"x": np.float64, "int": str, "frac": str}, encoding=encoding)
+
+    # '0' + '.' + '00082945'; lines without a decimal part keep the integer
+    value = raw["int"].where(raw["frac"].isna(), raw["int"] + "." + raw["frac"])
+
+    df = pd.DataFrame({
+        names[0]: raw["x"].to_numpy(),
+        names[1]: pd.to_numeric(value).to_numpy(dtype=np.float64),
+    })
+    df.attrs["units"] = {name: unit.strip().strip("[]") for name, unit in zip(names, units)}
+    return df
+
+
+def _fix_one(input_path, output_path):
+    t0 = time.perf_counter()
+    n_bytes = fix_file_mmap(input_path, output_path)
+    return input_path, output_path, n_bytes, time.perf_counter() - t0
+
+
+def pending_files(data_dir, manifest=None):
+    for input_path in sorted(data_dir.glob("*.csv")):
+
+        # Skip already processed files
+        if input_path.stem.endswith("_fixed"):
+            continue
+
+        output_path = input_path.with_name(input_path.stem + "_fixed.csv")
+
+        # Skip files unchanged since the last run
+        if manifest is not None and not needs_rebuild(manifest, input_path, output_path):
+            continue
+
+        yield input_path, output_path
+
+
+def main():
+    manifest_path = data_dir / MANIFEST_NAME
+    manifest = load_manifest(manifest_path) if incremental_build else None
+
+    jobs = list(pending_files(data_dir, manifest))
+
+    if use_mmap_fast_path:
+        with ProcessPoolExecutor(max_workers=NUM_WORKERS) as pool:
+            futures = [pool.submit(_fix_one, i, o) for i, o in jobs]
+            for future in futures:
+                input_path, output_path, n_bytes, seconds = future.result()
+                mb_s = n_bytes / 1e6 / max(seconds, 1e-9)
+                print(f"Fixed: {input_path.name} → {output_path.name} ({mb_s:.1f} MB/s)")
+                if manifest is not None:
+                    record_build(manifest, input_path, output_path)
+    else:
+        for input_path, output_path in jobs:
+            fix_file_lines(input_path, output_path)
+            print(f"Fixed: {input_path.name} → {output_path.name}")
+            if manifest is not None:
+                record_build(manifest, input_path, output_path)
+
+    if manifest is not None:
+        save_manifest(manifest_path, manifest)
+        if not jobs:
+            print("Nothing to do, all files are up to date.")
+
+    print("Done. All CSV files processed.")
+
+
+if __name__ == "__main__":
+    main()
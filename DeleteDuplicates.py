@@ -1,44 +1,226 @@
 import pandas as pd
+import numpy as np
 import os
+import tempfile
+import time
+
 # Load the file (update the filename and extension if needed)
 filename = "INPUT_MTU_density.csv"  # or 'your_file.xlsx'
-file_extension = filename.split('.')[-1]
-
-# Read the file
-if file_extension == 'csv':
-    df = pd.read_csv(filename,encoding='windows-1252')
-elif file_extension == 'xlsx':
-    df = pd.read_excel(filename)
-else:
+encoding = 'windows-1252'
+
+# === SWITCHES ===
+external_memory_dedup = False   # If True, dedup CSVs out-of-core (hash-partitioned spill files)
+CHUNK_SIZE = 500_000            # rows per chunk in external-memory mode
+NUM_PARTITIONS = 64             # number of hash partitions (spill files)
+tolerance_dedup = False         # If True, merge rows whose first key column differs by less than TOLERANCE
+TOLERANCE = 1e-6                # tolerance on the first selected (time) column
+NEAR_DUPLICATE_KEEP = "first"   # "first", "last" or "mean"
+
+
+def read_table(filename):
+    file_extension = filename.split('.')[-1]
+    if file_extension == 'csv':
+        return pd.read_csv(filename, encoding=encoding)
+    elif file_extension == 'xlsx':
+        return pd.read_excel(filename)
     raise ValueError("Unsupported file format. Use .csv or .xlsx")
 
-# Show indexed column list
-print("\nAvailable columns:")
-for idx, col in enumerate(df.columns):
-    print(f"{idx}: {col}")
 
-# User selects by index
-selected_indices = input("\nEnter index number(s) of columns to check for duplicates (comma-separated): ")
-selected_indices = [int(i.strip()) for i in selected_indices.split(',')]
+def write_table(df, output_filename):
+    if output_filename.endswith('.csv'):
+        df.to_csv(output_filename, index=False)
+    elif output_filename.endswith('.xlsx'):
+        df.to_excel(output_filename, index=False)
+
+
+def cleaned_filename(filename):
+    base_name, ext = os.path.splitext(filename)
+    return f"{base_name}_cleaned_file{ext}"
+
+
+def choose_key_columns(columns):
+    # Show indexed column list
+    print("\nAvailable columns:")
+    for idx, col in enumerate(columns):
+        print(f"{idx}: {col}")
+
+    # User selects by index
+    selected_indices = input("\nEnter index number(s) of columns to check for duplicates (comma-separated): ")
+    selected_indices = [int(i.strip()) for i in selected_indices.split(',')]
+
+    # Map indices to column names
+    return [columns[i] for i in selected_indices]
+
+
+def _partition_of(keys, num_partitions):
+    """Hash key rows into partitions. Numeric keys are hashed as float64 so
+    that 1 and 1.0 land in the same partition whatever dtype a chunk got."""
+    keys = keys.copy()
+    for col in keys.columns:
+        if pd.api.types.is_numeric_dtype(keys[col]):
+            keys[col] = keys[col].astype(np.float64)
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy()
+    return hashes % np.uint64(num_partitions)
+
+
+def _key_dtypes(filename, selected_columns, chunk_size):
+    """
+    Key column dtypes a whole-file read would infer, from a chunked pre-pass:
+    float64 where every chunk parsed as numbers, str otherwise. Both passes
+    use them, so a key like 2 is parsed the same way in every chunk.
+    """
+    kinds = {}
+    for chunk in pd.read_csv(filename, encoding=encoding, usecols=selected_columns,
+                             chunksize=chunk_size):
+        if len(chunk) == 0:
+            continue
+        for col, dtype in chunk.dtypes.items():
+            kind = "f" if dtype.kind in "iuf" else "O"
+            kinds[col] = "O" if kinds.get(col, kind) != kind else kind
+    return {col: np.float64 if kinds.get(col) == "f" else str for col in selected_columns}
+
+
+def drop_duplicates_external(filename, selected_columns, output_filename,
+                             chunk_size=CHUNK_SIZE, num_partitions=NUM_PARTITIONS):
+    """
+    Out-of-core drop_duplicates(subset=selected_columns) for CSV files.
+
+    A pre-pass fixes the key dtypes, see _key_dtypes(). Pass 1 streams the
+    file and spills (key columns, row number) into one temporary CSV per
+    hash partition. Equal keys always share a partition, so each partition
+    can be deduplicated on its own; rows are spilled in file order, so
+    keep='first' keeps the first occurrence.
+    Pass 2 streams the file again and writes the surviving rows in their
+    original order.
+
+    Memory is bounded by one chunk, the largest partition (key columns only)
+    and a keep mask of one byte per input row.
+    Returns (rows_in, rows_out).
+    """
+    key_dtypes = _key_dtypes(filename, selected_columns, chunk_size)
+    with tempfile.TemporaryDirectory(prefix="dedup_") as spill_dir:
+        spill_paths = [os.path.join(spill_dir, f"part_{p}.csv") for p in range(num_partitions)]
+        spilled = [False] * num_partitions
+
+        # Pass 1: hash-partition the key columns
+        rows_in = 0
+        for chunk in pd.read_csv(filename, encoding=encoding, usecols=selected_columns,
+                                 dtype=key_dtypes, chunksize=chunk_size):
+            keys = chunk[selected_columns]
+            keys.insert(0, "__row__", np.arange(rows_in, rows_in + len(chunk)))
+            parts = _partition_of(chunk[selected_columns], num_partitions)
+            for p in np.unique(parts):
+                keys[parts == p].to_csv(spill_paths[p], mode="a", header=not spilled[p], index=False)
+                spilled[p] = True
+            rows_in += len(chunk)
+
+        # Dedup every partition on its own
+        keep = np.zeros(rows_in, dtype=bool)
+        for p in range(num_partitions):
+            if not spilled[p]:
+                continue
+            part = pd.read_csv(spill_paths[p], dtype={"__row__": np.int64, **key_dtypes})
+            first_rows = part.drop_duplicates(subset=part.columns[1:])["__row__"].to_numpy()
+            keep[first_rows] = True
+
+    # Pass 2: write surviving rows in the original order
+    rows_out = 0
+    start = 0
+    header_written = False
+    for chunk in pd.read_csv(filename, encoding=encoding, chunksize=chunk_size):
+        kept = chunk[keep[start:start + len(chunk)]]
+        kept.to_csv(output_filename, mode="a" if header_written else "w",
+                    header=not header_written, index=False)
+        header_written = True
+        start += len(chunk)
+        rows_out += len(kept)
+
+    return rows_in, rows_out
+
+
+def drop_near_duplicates(df, key_column, tolerance=TOLERANCE, keep=NEAR_DUPLICATE_KEEP, exact_columns=()):
+    """
+    Merge rows whose key_column values differ by less than `tolerance`
+    (and whose exact_columns are equal). Sort-based and vectorized: O(n log n).
+
+    Neighbours in sorted order are chained, so 0.0, 0.6*tol, 1.2*tol form one group.
+    keep="first"/"last" keeps the first/last row of each group in file order
+    (the result stays in file order); keep="mean" averages the numeric columns,
+    takes the first value of the others and returns the groups in key order.
+    """
+    if keep not in ("first", "last", "mean"):
+        raise ValueError("keep must be 'first', 'last' or 'mean'")
+    n = len(df)
+    if n == 0:
+        return df
+
+    key = pd.to_numeric(df[key_column], errors="coerce").to_numpy(dtype=np.float64)
+    codes = [pd.factorize(df[col])[0] for col in exact_columns]
+
+    # Stable sort: exact columns first, then the tolerance key
+    order = np.lexsort([key] + codes[::-1]) if codes else np.argsort(key, kind="stable")
+
+    new_group = np.empty(n, dtype=bool)
+    new_group[0] = True
+    new_group[1:] = ~(np.diff(key[order]) < tolerance)   # NaN keys never merge
+    for c in codes:
+        new_group[1:] |= np.diff(c[order]) != 0
+    starts = np.flatnonzero(new_group)
+
+    if keep == "first":
+        return df.iloc[np.sort(np.minimum.reduceat(order, starts))]
+    if keep == "last":
+        return df.iloc[np.sort(np.maximum.reduceat(order, starts))]
+
+    group_ids = np.cumsum(new_group) - 1
+    aggregations = {col: "mean" if pd.api.types.is_numeric_dtype(df[col]) else "first" for col in df.columns}
+    return df.iloc[order].groupby(group_ids, sort=False).agg(aggregations).reset_index(drop=True)
+
+
+def report(filename, rows_in, rows_out, seconds):
+    size_mb = os.path.getsize(filename) / 1e6
+    seconds = max(seconds, 1e-9)
+    print(f"Rows in: {rows_in}, rows out: {rows_out} ({rows_in - rows_out} duplicates removed)")
+    print(f"Throughput: {rows_in / seconds:,.0f} rows/s, {size_mb / seconds:.1f} MB/s ({seconds:.2f} s)")
+
+
+def main(key_columns=None):
+    """Deduplicate `filename`; key_columns=None asks for them interactively."""
+    file_extension = filename.split('.')[-1]
+    if file_extension not in ('csv', 'xlsx'):
+        raise ValueError("Unsupported file format. Use .csv or .xlsx")
+
+    # Construct output filename
+    output_filename = cleaned_filename(filename)
+
+    if external_memory_dedup and file_extension == 'csv' and not tolerance_dedup:
+        columns = pd.read_csv(filename, encoding=encoding, nrows=0).columns
+        selected_columns = key_columns or choose_key_columns(columns)
 
-# Map indices to column names
-selected_columns = [df.columns[i] for i in selected_indices]
+        t0 = time.perf_counter()
+        rows_in, rows_out = drop_duplicates_external(filename, selected_columns, output_filename)
+    else:
+        if external_memory_dedup and not tolerance_dedup:
+            print("External-memory mode supports CSV only, loading the whole file.")
+        df = read_table(filename)
+        selected_columns = key_columns or choose_key_columns(df.columns)
 
-# Drop duplicates
-df_cleaned = df.drop_duplicates(subset=selected_columns)
+        # Drop duplicates
+        t0 = time.perf_counter()
+        if tolerance_dedup:
+            df_cleaned = drop_near_duplicates(df, selected_columns[0], TOLERANCE, NEAR_DUPLICATE_KEEP,
+                                              exact_columns=selected_columns[1:])
+        else:
+            df_cleaned = df.drop_duplicates(subset=selected_columns)
 
-# Construct output filename
-base_name, ext = os.path.splitext(filename)
-output_filename = f"{base_name}_cleaned_file{ext}"
+        # Save the cleaned file
+        write_table(df_cleaned, output_filename)
+        rows_in, rows_out = len(df), len(df_cleaned)
 
-# Save the cleaned file
-if file_extension == 'csv':
-    df_cleaned.to_csv(output_filename, index=False)
-elif file_extension == 'xlsx':
-    df_cleaned.to_excel(output_filename, index=False)
+    print(f"\nDuplicate rows based on column(s) {selected_columns} removed.")
+    print(f"Cleaned data saved to '{output_filename}'.")
+    report(filename, rows_in, rows_out, time.perf_counter() - t0)
 
-print(f"\nDuplicate rows based on column(s) {selected_columns} removed.")
-print(f"Cleaned data saved to '{output_filename}'.")
 
-print(f"\nDuplicate rows based on column(s) {selected_columns} removed.")
-print(f"Cleaned data saved to '{output_filename}'.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
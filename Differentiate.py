@@ -1,39 +1,132 @@
 import pandas as pd
 import numpy as np
 
+from csv_loader import iter_numeric_chunks, read_csv_cached, read_numeric_mmap
+
 # Replace with your filename
 filename = 'ForwardCombustion_calculated_pressure_cleaned_file.csv'  # The file should have at least two columns: time and value
 
-def differentiate(data, time_col, value_col):
-    t = data[time_col].values
-    y = data[value_col].values
-    dy_dt = np.zeros_like(y)
+# Change these if your column names are different
+time_col = 'crank'
+value_cols = ['Pressure']          # one or more columns to differentiate
+
+# === SWITCHES ===
+second_order_edges = False         # 3-point one-sided differences at the first/last point
+nonuniform_interior = False        # 2nd-order interior stencil for non-uniform spacing
+chunked = False                    # Differentiate out-of-core, chunk by chunk
+CHUNK_SIZE = 1_000_000             # rows per chunk in chunked mode
+HALO = 2                           # rows borrowed from the neighbouring chunks
+numeric_mmap = False               # Read all-numeric files through the memory-mapped .npy cache (no copies)
+
 
-    # Forward difference for first point
-    dy_dt[0] = (y[1] - y[0]) / (t[1] - t[0])
+def derivative(t, y, edge_order=1, nonuniform=False):
+    """
+    dy/dt for one or many columns at once (y of shape (n,) or (n, k)).
+
+    Interior: (y[i+1] - y[i-1]) / (t[i+1] - t[i-1]), as the original loop,
+    or with nonuniform=True the 2nd-order stencil for uneven spacing
+    (the one np.gradient uses). Edges: one-sided differences, 2nd order
+    (3 points) with edge_order=2.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    tt = t.reshape((-1,) + (1,) * (y.ndim - 1))   # broadcast against y columns
+    dy_dt = np.empty_like(y)
 
     # Central difference for internal points
-    for i in range(1, len(y)-1):
-        dy_dt[i] = (y[i+1] - y[i-1]) / (t[i+1] - t[i-1])
+    if nonuniform:
+        h1 = tt[1:-1] - tt[:-2]
+        h2 = tt[2:] - tt[1:-1]
+        dy_dt[1:-1] = (h1**2 * y[2:] + (h2**2 - h1**2) * y[1:-1] - h2**2 * y[:-2]) / (h1 * h2 * (h1 + h2))
+    else:
+        dy_dt[1:-1] = (y[2:] - y[:-2]) / (tt[2:] - tt[:-2])
 
-    # Backward difference for last point
-    dy_dt[-1] = (y[-1] - y[-2]) / (t[-1] - t[-2])
+    if edge_order == 2 and len(t) >= 3:
+        h1, h2 = tt[1] - tt[0], tt[2] - tt[1]
+        dy_dt[0] = (-(2 * h1 + h2) / (h1 * (h1 + h2)) * y[0] + (h1 + h2) / (h1 * h2) * y[1]
+                    - h1 / (h2 * (h1 + h2)) * y[2])
+        h1, h2 = tt[-2] - tt[-3], tt[-1] - tt[-2]
+        dy_dt[-1] = (h2 / (h1 * (h1 + h2)) * y[-3] - (h1 + h2) / (h1 * h2) * y[-2]
+                     + (2 * h2 + h1) / (h2 * (h1 + h2)) * y[-1])
+    else:
+        # Forward difference for first point, backward difference for last point
+        dy_dt[0] = (y[1] - y[0]) / (tt[1] - tt[0])
+        dy_dt[-1] = (y[-1] - y[-2]) / (tt[-1] - tt[-2])
 
     return dy_dt
 
+
+def differentiate(data, time_col, value_col, edge_order=1, nonuniform=False):
+    return derivative(data[time_col].values, data[value_col].values, edge_order, nonuniform)
+
+
+def output_column_names(value_cols):
+    # keep the historical name for the single-column case
+    if len(value_cols) == 1:
+        return ['dvalue_dt']
+    return [f'd{col}_dt' for col in value_cols]
+
+
+def differentiate_chunks(chunks, time_col, value_cols, edge_order=1, nonuniform=False):
+    """
+    Out-of-core differentiation of an iterable of DataFrame chunks.
+
+    Every chunk is differentiated together with HALO rows of its neighbours
+    (the next chunk is read ahead), so interior points at chunk boundaries
+    get exactly the same stencil as in the in-memory path; the true first
+    and last points keep their one-sided formulas. Yields the chunks with
+    the derivative columns added.
+    """
+    out_cols = output_column_names(value_cols)
+    before = None        # last HALO rows already written
+    queue = []           # chunks waiting for HALO rows of look-ahead
+
+    def finish(chunk, after):
+        parts = [p for p in (before, chunk, after) if p is not None and len(p)]
+        window = pd.concat(parts, ignore_index=True) if len(parts) > 1 else chunk
+        d = derivative(window[time_col].values, window[value_cols].values, edge_order, nonuniform)
+        start = 0 if before is None else len(before)
+        chunk = chunk.copy()
+        chunk[out_cols] = d[start:start + len(chunk)]
+        return chunk
+
+    def emit(final):
+        nonlocal before
+        while queue and (final or sum(len(c) for c in queue[1:]) >= HALO):
+            chunk = queue.pop(0)
+            after = pd.concat(queue).iloc[:HALO] if queue else None
+            yield finish(chunk, after)
+            before = chunk.iloc[-HALO:] if before is None else pd.concat([before, chunk]).iloc[-HALO:]
+
+    for chunk in chunks:
+        queue.append(chunk)
+        yield from emit(final=False)
+    yield from emit(final=True)
+
+
 def main():
+    output_filename = filename.replace('.csv', '_differentiated.csv')
+
+    if chunked:
+        if numeric_mmap:
+            reader = iter_numeric_chunks(filename, CHUNK_SIZE)
+        else:
+            reader = pd.read_csv(filename, chunksize=CHUNK_SIZE)
+        for i, chunk in enumerate(differentiate_chunks(reader, time_col, value_cols,
+                                                       2 if second_order_edges else 1, nonuniform_interior)):
+            chunk.to_csv(output_filename, mode='w' if i == 0 else 'a', header=(i == 0), index=False)
+        print(f"Saved differentiated data to {output_filename}")
+        return
+
     # Load CSV
-    df = pd.read_csv(filename)
+    df = read_numeric_mmap(filename) if numeric_mmap else read_csv_cached(filename)
     print("Columns in file:", list(df.columns))
 
-    # Change these if your column names are different
-    time_col = 'crank'
-    value_col = 'Pressure'
-
-    df['dvalue_dt'] = differentiate(df, time_col, value_col)
+    d = derivative(df[time_col].values, df[value_cols].values,
+                   2 if second_order_edges else 1, nonuniform_interior)
+    df[output_column_names(value_cols)] = d
 
     # Save result
-    output_filename = filename.replace('.csv', '_differentiated.csv')
     df.to_csv(output_filename, index=False)
     print(f"Saved differentiated data to {output_filename}")
 
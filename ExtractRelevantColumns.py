@@ -1,7 +1,27 @@
+import importlib.util
 import pandas as pd
 from tkinter import Tk
 from tkinter.filedialog import askopenfilename, asksaveasfilename
 
+# === SWITCHES ===
+use_pyarrow_engine = True   # Use the multithreaded pyarrow reader when it is installed
+
+
+def get_read_engine():
+    """Return 'pyarrow' if requested and installed, otherwise the C engine."""
+    if use_pyarrow_engine and importlib.util.find_spec("pyarrow") is not None:
+        return "pyarrow"
+    return "c"
+
+
+def extract_columns(csv_file, save_path, columns, sep=';'):
+    """Parse only `columns` of csv_file and save them, in that order, to save_path."""
+    # usecols does not keep the order, so reorder
+    df = pd.read_csv(csv_file, sep=sep, usecols=columns, engine=get_read_engine())
+    df[columns].to_csv(save_path, index=False)
+    return len(df)
+
+
 def keep_selected_columns():
     # Hide the root window
     root = Tk()
@@ -13,12 +33,12 @@ def keep_selected_columns():
         print("No file selected.")
         return
 
-    # df = pd.read_csv(csv_file)
-    df = pd.read_csv(csv_file, sep=';')
+    # Header only: the data is loaded after the columns are chosen
+    header = pd.read_csv(csv_file, sep=';', nrows=0)
 
     # Display columns with indices
     print("\nAvailable columns:")
-    for i, col in enumerate(df.columns):
+    for i, col in enumerate(header.columns):
         print(f"{i}: {col}")
 
     # Prompt user for indices to keep
@@ -31,18 +51,17 @@ def keep_selected_columns():
         print("Invalid input. Please enter integers separated by commas.")
         return
 
-    columns_to_keep = [df.columns[i] for i in indices]
+    columns_to_keep = [header.columns[i] for i in indices]
     print(f"\nKeeping columns: {columns_to_keep}")
-    df_filtered = df[columns_to_keep]
 
-    # Save filtered file
+    # Save filtered file (only the chosen columns are parsed)
     print("\nSelect where to save the new CSV...")
     save_path = asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
     if save_path:
-        df_filtered.to_csv(save_path, index=False)
+        extract_columns(csv_file, save_path, columns_to_keep)
         print(f"Filtered file saved to: {save_path}")
     else:
         print("Save canceled.")
 
 if __name__ == "__main__":
-    keep_selected_columns()
\ No newline at end of file
+    keep_selected_columns()
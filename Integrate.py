@@ -0,0 +1,176 @@
+import glob
+import pandas as pd
+import numpy as np
+
+# Files to integrate (glob patterns) - e.g. rate of heat release -> cumulative heat release
+file_patterns = ['data/done/ROHR_noOffsets_HTC_*_fixed.csv']
+
+# Change these if your column names are different
+x_col = 'CRANKANGLE'
+value_cols = None                 # None = every column except x_col (and cycle_col)
+
+# === SWITCHES ===
+method = 'trapezoid'              # 'trapezoid' or 'simpson'
+reset_per_cycle = False           # Restart the integral at every engine cycle
+cycle_col = None                  # e.g. 'Cycle [-]' from convert_MTU_csv; None = detect crank angle wraps
+WRAP_JUMP_THRESHOLD = -300.0      # same wrap detection as convert_MTU_csv [deg]
+CHUNK_SIZE = 1_000_000            # rows per chunk (files are streamed)
+
+
+def interval_areas(x, y, new_segment, method='trapezoid'):
+    """
+    Area of every interval [x[i-1], x[i]] for many columns at once
+    (y of shape (n, k)); areas[i] belongs to row i, and is 0 where a new
+    segment (cycle) starts.
+
+    'simpson' integrates the parabola through the points i-2, i-1, i over
+    the last interval (non-uniform spacing is fine); the first interval of a
+    segment uses the parabola through i-1, i, i+1 instead, or the trapezoid
+    if the segment has only two points.
+    """
+    n = len(x)
+    areas = np.zeros_like(y)
+    if n < 2:
+        return areas
+
+    h = np.diff(x)[:, None]
+    areas[1:] = 0.5 * h * (y[1:] + y[:-1])
+
+    if method == 'simpson' and n >= 3:
+        # Newton form of the parabola through (x0, x1, x2)
+        h1 = (x[1:-1] - x[:-2])[:, None]
+        h2 = (x[2:] - x[1:-1])[:, None]
+        y0, y1, y2 = y[:-2], y[1:-1], y[2:]
+        d1 = (y1 - y0) / h1
+        d2 = ((y2 - y1) / h2 - d1) / (h1 + h2)
+
+        backward = y0 * h2 + d1 / 2 * (h2**2 + 2 * h1 * h2) + d2 * (h2**3 / 3 + h1 * h2**2 / 2)  # over [x1, x2]
+        forward = y0 * h1 + d1 * h1**2 / 2 - d2 * h1**3 / 6                                     # over [x0, x1]
+
+        use_backward = ~new_segment[1:-1]                    # x0 lies in the same segment
+        areas[2:] = np.where(use_backward[:, None], backward, areas[2:])
+        use_forward = new_segment[:-2] & ~new_segment[2:]    # first interval of a segment
+        areas[1:-1] = np.where(use_forward[:, None], forward, areas[1:-1])
+
+    areas[new_segment] = 0.0
+    return areas
+
+
+def running_sum(areas, new_segment, carry):
+    """
+    Cumulative sum that restarts at 0 on every new segment, starting from
+    carry. Every segment gets its own cumsum, so late cycles do not lose
+    precision to large running totals.
+    """
+    total = np.empty_like(areas)
+    starts = np.flatnonzero(new_segment)
+    bounds = np.concatenate(([0], starts[starts > 0], [len(areas)]))
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if hi == lo:
+            continue
+        np.cumsum(areas[lo:hi], axis=0, out=total[lo:hi])
+        if lo == 0 and not new_segment[0]:
+            total[lo:hi] += carry   # continues the segment of the previous chunk
+    return total
+
+
+def integrate_chunks(chunks, x_col, value_cols=None, method='trapezoid', reset_per_cycle=False, cycle_col=None):
+    """
+    Stream chunks and yield them with 'cumulative_<col>' columns added.
+
+    The running sums and the last rows are carried across chunk boundaries;
+    the last row of a chunk is held back until the next chunk arrives
+    (Simpson may need one point of look-ahead), so the result does not
+    depend on the chunk size.
+    """
+    context = None    # last 2 emitted rows (x, y, new_segment) for the Simpson stencil
+    held = None       # rows not emitted yet
+    carry = None
+
+    def new_segments(chunk, prev_x, prev_cycle):
+        x = chunk[x_col].to_numpy(dtype=np.float64)
+        seg = np.zeros(len(chunk), dtype=bool)
+        if reset_per_cycle:
+            if cycle_col is not None:
+                c = chunk[cycle_col].to_numpy()
+                seg[1:] = c[1:] != c[:-1]
+                seg[0] = prev_cycle is not None and c[0] != prev_cycle
+            else:
+                seg = np.diff(x, prepend=np.nan if prev_x is None else prev_x) < WRAP_JUMP_THRESHOLD
+        if prev_x is None:
+            seg[0] = True
+        return seg
+
+    def integrated_columns(columns):
+        return value_cols or [c for c in columns if c not in (x_col, cycle_col, '__new_segment__')]
+
+    def process(final):
+        nonlocal context, held, carry
+        cols = integrated_columns(held.columns)
+        x = held[x_col].to_numpy(dtype=np.float64)
+        y = held[cols].to_numpy(dtype=np.float64)
+        seg = held['__new_segment__'].to_numpy()
+
+        if context is not None:
+            cx, cy, cseg = context
+            x, y, seg = np.concatenate((cx, x)), np.concatenate((cy, y)), np.concatenate((cseg, seg))
+        start = len(x) - len(held)
+
+        areas = interval_areas(x, y, seg, method)[start:]
+        emit = len(held) if final else max(len(held) - 1, 0)
+        if carry is None:
+            carry = np.zeros(len(cols))
+        total = running_sum(areas[:emit], seg[start:start + emit], carry)
+
+        out = held.iloc[:emit].drop(columns='__new_segment__')
+        out[[f'cumulative_{c}' for c in cols]] = total
+        if emit:
+            carry = total[-1]
+            keep = start + emit
+            context = (x[max(0, keep - 2):keep], y[max(0, keep - 2):keep], seg[max(0, keep - 2):keep])
+        held = held.iloc[emit:]
+        return out
+
+    columns = None
+    for chunk in chunks:
+        columns = chunk.columns
+        if len(chunk) == 0:
+            continue
+        prev_x = None if held is None else held[x_col].iloc[-1]
+        prev_cycle = None if held is None or cycle_col is None else held[cycle_col].iloc[-1]
+        chunk = chunk.assign(__new_segment__=new_segments(chunk, prev_x, prev_cycle))
+        held = chunk if held is None else pd.concat([held, chunk], ignore_index=True)
+        yield process(final=False)
+    if held is not None and len(held):
+        yield process(final=True)
+    elif held is None and columns is not None:
+        # header-only file: just the header, with the cumulative columns
+        yield pd.DataFrame(columns=[*columns, *(f'cumulative_{c}' for c in integrated_columns(columns))])
+
+
+def integrate_file(filename):
+    output_filename = filename.replace('.csv', '_integrated.csv')
+    reader = pd.read_csv(filename, chunksize=CHUNK_SIZE)
+    chunks = integrate_chunks(reader, x_col, value_cols, method, reset_per_cycle, cycle_col)
+    header = True
+    for chunk in chunks:
+        if len(chunk) == 0 and not header:
+            continue
+        chunk.to_csv(output_filename, mode='w' if header else 'a', header=header, index=False)
+        header = False
+    return output_filename
+
+
+def main():
+    files = sorted({f for pattern in file_patterns for f in glob.glob(pattern)})
+    files = [f for f in files if not f.endswith('_integrated.csv')]
+    if not files:
+        print("No files found.")
+        return
+
+    for filename in files:
+        output_filename = integrate_file(filename)
+        print(f"Saved integrated data to {output_filename}")
+
+if __name__ == '__main__':
+    main()
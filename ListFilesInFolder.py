@@ -1,9 +1,185 @@
 import os
 import csv
-from tkinter import Tk
-from tkinter.filedialog import askdirectory
+import codecs
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+# === SWITCHES ===
+build_full_catalog = True     # If False, only write the bare file names (file_list.csv)
+recursive_scan = True         # Catalog: also scan sub-folders
+NUM_WORKERS = os.cpu_count()  # Catalog: parallel file scanning
+SNIFF_BYTES = 64 * 1024       # Catalog: bytes read to sniff encoding/delimiter/header
+
+CATALOG_NAME = "file_catalog.csv"
+CATALOG_FIELDS = ["path", "size", "mtime", "encoding", "delimiter", "decimal", "header", "columns", "rows"]
+
+
+def iter_files(folder_path, recursive=True):
+    """Yield (path, stat) for every file below folder_path (hidden entries skipped)."""
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if recursive:
+                    yield from iter_files(entry.path, recursive)
+            elif entry.is_file():
+                yield entry.path, entry.stat()
+
+
+def sniff_encoding(head):
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    try:
+        # not final: the sample may end in the middle of a character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "windows-1252"
+
+
+def _split(line, delimiter):
+    return line.split() if delimiter == "whitespace" else next(csv.reader([line], delimiter=delimiter))
+
+
+def _is_number(field):
+    return re.fullmatch(r"\s*[-+]?(\d+([.,]\d*)?|[.,]\d+)([eE][-+]?\d+)?\s*", field) is not None
+
+
+def sniff_layout(text):
+    """Return (delimiter, decimal mark, has_header, columns) from the first lines."""
+    lines = [line for line in text.splitlines()[:50] if line.strip()]
+    if not lines:
+        return "", "", False, []
+    sample = "\n".join(lines)
+
+    try:
+        delimiter = csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        delimiter = "whitespace" if len(lines[0].split()) > 1 else ","
+
+    first = _split(lines[0], delimiter)
+    has_header = not all(_is_number(f) for f in first if f.strip())
+
+    data = [_split(line, delimiter) for line in lines[1:]]
+    data = [fields for fields in data if fields and all(_is_number(f) for f in fields if f.strip())]
+    decimal = "."
+    if delimiter != "," and any(re.search(r"\d,\d", f) for fields in data for f in fields):
+        decimal = ","
+    elif delimiter == "," and has_header and data and all(len(fields) > len(first) for fields in data):
+        # e.g. '-360,0,00082945' under a two-column header
+        decimal = ","
+
+    return delimiter, decimal, has_header, first if has_header else []
+
+
+def count_lines(path, block_size=1 << 20):
+    """Count lines in bulk (newline bytes per block)."""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            lines += block.count(b"\n")
+            last = block[-1:]
+    return lines + (last != b"\n")
+
+
+def scan_file(path, stat=None):
+    """One catalog row for path."""
+    stat = stat or os.stat(path)
+    with open(path, "rb") as f:
+        head = f.read(SNIFF_BYTES)
+
+    encoding = sniff_encoding(head)
+    text = head.decode(encoding, errors="replace")
+    if len(head) == SNIFF_BYTES:
+        text = text[:text.rfind("\n") + 1]   # drop the partial last line
+    delimiter, decimal, has_header, columns = sniff_layout(text)
+
+    rows = count_lines(path) - (1 if has_header else 0)
+    return {
+        "path": path,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "encoding": encoding,
+        "delimiter": "\\t" if delimiter == "\t" else delimiter,
+        "decimal": decimal,
+        "header": has_header,
+        "columns": "|".join(columns),
+        "rows": max(rows, 0),
+    }
+
+
+def _scan_worker(path):
+    """scan_file() or, if the file cannot be scanned, None and the reason."""
+    try:
+        return scan_file(path), ""
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def load_catalog(catalog_path):
+    """Existing catalog rows keyed by path (empty if there is none)."""
+    try:
+        with open(catalog_path, newline="", encoding="utf-8") as f:
+            return {row["path"]: row for row in csv.DictReader(f)}
+    except OSError:
+        return {}
+
+
+def build_catalog(folder_path, catalog_path=None, recursive=True, workers=NUM_WORKERS):
+    """
+    Scan folder_path and write one catalog row per file. Files whose size
+    and mtime match the previous catalog are not opened again; the others
+    are sniffed in parallel. Returns the (path, reason) of every file
+    that could not be scanned.
+    """
+    catalog_path = catalog_path or os.path.join(folder_path, CATALOG_NAME)
+    previous = load_catalog(catalog_path)
+
+    rows = {}
+    to_scan = []
+    failed = []
+    for path, stat in iter_files(folder_path, recursive):
+        if os.path.abspath(path) == os.path.abspath(catalog_path):
+            continue
+        rel_path = os.path.relpath(path, folder_path)
+        old = previous.get(rel_path)
+        if old is not None and int(old["size"]) == stat.st_size and float(old["mtime"]) == stat.st_mtime:
+            rows[rel_path] = old
+        else:
+            to_scan.append((rel_path, path))
+    reused = len(rows)
+
+    if to_scan:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_scan_worker, [path for _, path in to_scan], chunksize=16)
+            for (rel_path, _), (row, reason) in zip(to_scan, results):
+                if row is None:
+                    failed.append((rel_path, reason))   # left out, so it is retried next time
+                    continue
+                row["path"] = rel_path
+                rows[rel_path] = row
+
+    with open(catalog_path, mode='w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=CATALOG_FIELDS)
+        writer.writeheader()
+        for rel_path in sorted(rows):
+            writer.writerow(rows[rel_path])
+
+    print(f"Scanned {len(to_scan) - len(failed)} file(s), reused {reused} unchanged entries, {len(failed)} failed.")
+    for rel_path, reason in failed:
+        print(f"  Could not scan {rel_path}: {reason}")
+    print(f"Saved catalog to {catalog_path}")
+    return failed
+
 
 def list_files_in_folder():
+    from tkinter import Tk
+    from tkinter.filedialog import askdirectory
+
     # Ask user to select a folder
     root = Tk()
     root.withdraw()
@@ -13,6 +189,10 @@ def list_files_in_folder():
         print("No folder selected.")
         return
 
+    if build_full_catalog:
+        build_catalog(folder_path, recursive=recursive_scan)
+        return
+
     # Get list of files (not folders)
     file_names = [f for f in os.listdir(folder_path) if os.path.isfile(os.path.join(folder_path, f))]
 
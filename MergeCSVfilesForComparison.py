@@ -1,7 +1,104 @@
+import csv
+import numpy as np
 import pandas as pd
 from tkinter import Tk
 from tkinter.filedialog import askopenfilename, asksaveasfilename
 
+from csv_loader import read_csv_cached
+
+# === SWITCHES ===
+nearest_merge_mode = False   # If True, N files, nearest/as-of match within a tolerance, streamed to disk
+TIME_COL = 'time'
+CHUNK_SIZE = 500_000         # rows per chunk of the first (reference) file
+
+
+def _read_more(stream, upto):
+    """Append chunks to stream['buf'] until it extends past `upto` (or EOF)."""
+    while not stream['done'] and (stream['buf'].empty or stream['buf'][TIME_COL].iloc[-1] <= upto):
+        chunk = next(stream['reader'], None)
+        if chunk is None:
+            stream['done'] = True
+            break
+        _check_sorted(chunk, stream['path'], stream['buf'])
+        stream['buf'] = pd.concat([stream['buf'], chunk], ignore_index=True)
+
+
+def _check_sorted(chunk, path, previous=None):
+    t = chunk[TIME_COL].to_numpy()
+    if (previous is not None and len(previous) and len(t) and t[0] < previous[TIME_COL].iloc[-1]) \
+            or np.any(np.diff(t) < 0):
+        raise ValueError(f"'{TIME_COL}' is not sorted ascending in {path}")
+
+
+def _drop_before(stream, t_min):
+    """Forget rows that no later reference row can match (keep one row before t_min)."""
+    buf = stream['buf']
+    first_needed = max(int(np.searchsorted(buf[TIME_COL].to_numpy(), t_min, side='left')) - 1, 0)
+    stream['buf'] = buf.iloc[first_needed:].reset_index(drop=True)
+
+
+def merge_csvs_nearest(files, suffixes, save_path, tolerance=None, direction='nearest', chunk_size=CHUNK_SIZE):
+    """
+    Merge N CSV files on TIME_COL onto the time grid of the first file.
+
+    Every other file is matched with pd.merge_asof (direction 'nearest',
+    'backward' or 'forward', optional tolerance), so timestamps do not have
+    to match exactly. Inputs must be sorted by TIME_COL; they are streamed
+    in chunks and each merged chunk is written straight to save_path.
+
+    Layout as in merge_csv_on_time_with_suffix_and_spacer(): time, file 1
+    columns + suffix, empty spacer column, file 2 columns + suffix, ...
+    The spacer is an all-NaN float column written as empty fields.
+    """
+    readers = [pd.read_csv(path, chunksize=chunk_size) for path in files]
+    others = [{'path': path, 'reader': reader, 'buf': pd.DataFrame(), 'done': False,
+               'columns': [c for c in pd.read_csv(path, nrows=0).columns if c != TIME_COL]}
+              for path, reader in zip(files[1:], readers[1:])]
+
+    base_columns = [c for c in pd.read_csv(files[0], nrows=0).columns if c != TIME_COL]
+    header = [TIME_COL] + [col + suffixes[0] for col in base_columns]
+    for i, stream in enumerate(others, start=1):
+        header += [''] + [col + suffixes[i] for col in stream['columns']]
+    with open(save_path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f, lineterminator='\n').writerow(header)   # to_csv() rows end in '\n' too
+
+    rows = 0
+    previous = None
+    for chunk in readers[0]:
+        if chunk.empty:
+            continue   # header-only reference file: the header row is all there is
+        _check_sorted(chunk, files[0], previous)
+        previous = chunk.iloc[-1:]
+        times = chunk[TIME_COL].astype(np.float64)
+        t_max = times.iloc[-1]
+        reach = 0.0 if tolerance is None else tolerance
+
+        parts = {TIME_COL: chunk[TIME_COL]}
+        for col in base_columns:
+            parts[col + suffixes[0]] = chunk[col]
+
+        left = pd.DataFrame({TIME_COL: times})
+        for i, stream in enumerate(others, start=1):
+            _read_more(stream, t_max + reach)
+            buf = stream['buf']
+            parts[f'__spacer{i}__'] = np.full(len(chunk), np.nan)
+
+            if len(buf):
+                right = buf.assign(**{TIME_COL: buf[TIME_COL].astype(np.float64)})
+                matched = pd.merge_asof(left, right, on=TIME_COL, direction=direction, tolerance=tolerance)
+            for col in stream['columns']:
+                key = f'__file{i}__{col}'
+                parts[key] = matched[col].to_numpy() if len(buf) else np.full(len(chunk), np.nan)
+
+            _drop_before(stream, t_max - reach)
+
+        # column names are already in the header (spacers are named '')
+        pd.DataFrame(parts).to_csv(save_path, mode='a', header=False, index=False)
+        rows += len(chunk)
+
+    return rows
+
+
 def merge_csv_on_time_with_suffix_and_spacer():
     root = Tk()
     root.withdraw()
@@ -21,8 +118,8 @@ def merge_csv_on_time_with_suffix_and_spacer():
     suffix2 = input("Enter suffix for the second file (e.g., '_real'): ")
 
     # Load files
-    df1 = pd.read_csv(file1)
-    df2 = pd.read_csv(file2)
+    df1 = read_csv_cached(file1)
+    df2 = read_csv_cached(file2)
 
     # Rename columns except 'time'
     df1_renamed = df1.rename(columns={col: col + suffix1 for col in df1.columns if col != 'time'})
@@ -52,5 +149,40 @@ def merge_csv_on_time_with_suffix_and_spacer():
     else:
         print("Save canceled.")
 
+def merge_n_csvs_nearest():
+    root = Tk()
+    root.withdraw()
+
+    num_files = int(input("Enter the number of CSV files to merge: "))
+    if num_files < 2:
+        print("Need at least 2 files to merge.")
+        return
+
+    files, suffixes = [], []
+    for i in range(num_files):
+        print(f"\nSelect CSV file {i + 1} (must be sorted by '{TIME_COL}')...")
+        path = askopenfilename(filetypes=[("CSV files", "*.csv")])
+        if not path:
+            print("No file selected.")
+            return
+        files.append(path)
+        suffixes.append(input(f"Enter suffix for file {i + 1} (e.g., '_sim'): "))
+
+    tolerance = input("\nMatching tolerance on time (Enter for none): ").strip()
+    tolerance = float(tolerance) if tolerance else None
+    direction = input("Match direction - nearest, backward or forward (Enter for nearest): ").strip() or 'nearest'
+
+    print("\nSelect where to save the merged CSV...")
+    save_path = asksaveasfilename(defaultextension=".csv", filetypes=[("CSV files", "*.csv")])
+    if not save_path:
+        print("Save canceled.")
+        return
+
+    rows = merge_csvs_nearest(files, suffixes, save_path, tolerance, direction)
+    print(f"Merged file saved to: {save_path} ({rows} rows)")
+
 if __name__ == "__main__":
-    merge_csv_on_time_with_suffix_and_spacer()
\ No newline at end of file
+    if nearest_merge_mode:
+        merge_n_csvs_nearest()
+    else:
+        merge_csv_on_time_with_suffix_and_spacer()
\ No newline at end of file
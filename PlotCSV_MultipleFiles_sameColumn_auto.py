@@ -1,16 +1,21 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import os
 from tkinter import Tk
 from tkinter.filedialog import askdirectory
-from scipy.interpolate import interp1d
+
+from csv_loader import read_csv_cached
+from resampling import float_dtype, resample_onto_grid
+from decimation import plot_xy
 
 # === SWITCHES ===
 custom_legend_names = True
 plotting_for_presentation = True
 enable_dual_y_axes = False
 prompt_for_title = True
+interpolation_method = 'linear'  # 'linear', 'nearest' or 'cubic'
+numeric_mmap = False             # All-numeric files: memory-mapped .npy columns instead of a parsed copy
+decimate_for_plotting = True     # Draw a min-max reduced copy of long series (data itself untouched)
 
 def select_folder():
     root = Tk()
@@ -21,7 +26,7 @@ def select_folder():
 def load_all_csvs_from_folder(folder_path):
     csv_files = [f for f in os.listdir(folder_path) if f.lower().endswith('.csv')]
     csv_paths = [os.path.join(folder_path, f) for f in csv_files]
-    dfs = [pd.read_csv(path, sep=';') for path in csv_paths]
+    dfs = [read_csv_cached(path, numeric_mmap=numeric_mmap, sep=';') for path in csv_paths]
     return dfs, csv_files
 
 def choose_columns(df_sample):
@@ -32,10 +37,6 @@ def choose_columns(df_sample):
     y_index = int(input("Enter index of Y-axis column: "))
     return df_sample.columns[x_index], df_sample.columns[y_index]
 
-def interpolate_to_common_x(x_target, x, y):
-    f_interp = interp1d(x, y, bounds_error=False, fill_value=np.nan)
-    return f_interp(x_target)
-
 def compare_csvs_from_folder():
     folder_path = select_folder()
     if not folder_path:
@@ -61,13 +62,11 @@ def compare_csvs_from_folder():
 
     x_base = dfs[0][x_col].values
     y_base = dfs[0][y_col].values
-    y_all = [y_base]
-
-    for df in dfs[1:]:
-        x = df[x_col].values
-        y = df[y_col].values
-        y_interp = interpolate_to_common_x(x_base, x, y)
-        y_all.append(y_interp)
+    # All series on the base X as one contiguous 2D array (row 0 = base)
+    y_all = np.empty((len(dfs), len(x_base)), dtype=float_dtype(*[df[y_col].values for df in dfs]))
+    y_all[0] = y_base
+    y_all[1:] = resample_onto_grid(x_base, [(df[x_col].values, df[y_col].values) for df in dfs[1:]],
+                                   interpolation_method)
 
     plt.figure(figsize=(12, 7))
     ax1 = plt.gca()
@@ -89,9 +88,9 @@ def compare_csvs_from_folder():
     for i in range(len(dfs)):
         color = colors[i % len(colors)]
         if enable_dual_y_axes and ax2 and i == 1:
-            ax2.plot(x_base, y_all[i], label=legends[i], linewidth=line_width, linestyle='-', color=color)
+            ax2.plot(*plot_xy(x_base, y_all[i], decimate_for_plotting), label=legends[i], linewidth=line_width, linestyle='-', color=color)
         else:
-            ax1.plot(x_base, y_all[i], label=legends[i], linewidth=line_width, linestyle='-' if i == 0 else '-', color=color)
+            ax1.plot(*plot_xy(x_base, y_all[i], decimate_for_plotting), label=legends[i], linewidth=line_width, linestyle='-' if i == 0 else '-', color=color)
 
     ax1.set_xlabel(x_col)
     ax1.set_ylabel(f"{y_label} [{y_units}]")
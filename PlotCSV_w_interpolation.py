@@ -1,11 +1,12 @@
-import pandas as pd
 import matplotlib.pyplot as plt
-import numpy as np
 from tkinter import Tk
 from tkinter.filedialog import askopenfilename
-from scipy.interpolate import interp1d
 import os
 
+from csv_loader import read_csv_cached
+from resampling import resample_onto_grid
+from decimation import plot_xy
+
 # === DELIMITER ===
 
 # === SWITCHES ===
@@ -14,6 +15,9 @@ plotting_for_presentation = True    # If True, use thicker lines and larger font
 enable_dual_y_axes = False           # Toggle dual right axis (created only if needed)
 prompt_for_title = True             # Prompt for plot title
 interpolate_second_to_first = True  # Put file #2 on file #1's X grid for clean overlay
+interpolation_method = 'linear'     # 'linear', 'nearest' or 'cubic'
+numeric_mmap = False                # All-numeric files: memory-mapped .npy columns instead of a parsed copy
+decimate_for_plotting = True        # Draw a min-max reduced copy of long series (data itself untouched)
 
 
 def select_and_load_csv(prompt="Select a data file"):
@@ -26,9 +30,9 @@ def select_and_load_csv(prompt="Select a data file"):
     ext = os.path.splitext(file_path)[1].lower()
     try:
         if ext == ".csv":
-            df = pd.read_csv(file_path, delimiter=',')
+            df = read_csv_cached(file_path, numeric_mmap=numeric_mmap, delimiter=',')
         elif ext == ".txt":
-            df = pd.read_csv(file_path, sep=r'\s+', engine='python')
+            df = read_csv_cached(file_path, numeric_mmap=numeric_mmap, sep=r'\s+', engine='python')
         else:
             print("Unsupported file format.")
             return None, None
@@ -67,14 +71,6 @@ def choose_columns(df, role, dual_axes: bool):
         yr_col = None
     return x_col, yl_col, yr_col
 
-def safe_interp(x_target, x_src, y_src):
-    """Interpolate y_src(x_src) onto x_target; handles unsorted x_src and OOR with NaN."""
-    order = np.argsort(x_src)
-    x_src_sorted = np.asarray(x_src)[order]
-    y_src_sorted = np.asarray(y_src)[order]
-    f = interp1d(x_src_sorted, y_src_sorted, bounds_error=False, fill_value=np.nan)
-    return f(x_target)
-
 def first_non_none(handles):
     for h in handles:
         if h is not None:
@@ -110,8 +106,11 @@ def compare_two_csvs():
     # ---- Interpolate file #2 onto file #1 x-grid if requested
     if interpolate_second_to_first:
         x_plot = x1
-        y2L = safe_interp(x1, x2, y2L_raw) if y2L_raw is not None else None
-        y2R = safe_interp(x1, x2, y2R_raw) if (enable_dual_y_axes and y2R_raw is not None) else None
+        # both series share x2: one sort and one bracket lookup
+        wanted = [y for y in (y2L_raw, y2R_raw if enable_dual_y_axes else None) if y is not None]
+        resampled = iter(resample_onto_grid(x1, [(x2, y) for y in wanted], interpolation_method))
+        y2L = next(resampled) if y2L_raw is not None else None
+        y2R = next(resampled) if (enable_dual_y_axes and y2R_raw is not None) else None
     else:
         x_plot = None   # use native grids
         y2L, y2R = y2L_raw, y2R_raw
@@ -161,14 +160,14 @@ def compare_two_csvs():
     lines1 = []
     if any_left and (y1L is not None):
         l1, = axL.plot(
-            x1, y1L, linewidth=line_width, linestyle='-',
+            *plot_xy(x1, y1L, decimate_for_plotting), linewidth=line_width, linestyle='-',
             color=color1,
             label=(file_label_1 if not any_right else None)
         )
         lines1.append(l1)
     if any_right and (y1R is not None):
         l2, = axR.plot(
-            x1, y1R, linewidth=line_width, linestyle='-',
+            *plot_xy(x1, y1R, decimate_for_plotting), linewidth=line_width, linestyle='-',
             color=color1
         )
         lines1.append(l2)
@@ -178,14 +177,14 @@ def compare_two_csvs():
     X2_for_plot = (x_plot if interpolate_second_to_first else x2)
     if any_left and (y2L is not None):
         l3, = axL.plot(
-            X2_for_plot, y2L, linewidth=line_width, linestyle='-',
+            *plot_xy(X2_for_plot, y2L, decimate_for_plotting), linewidth=line_width, linestyle='-',
             color=color2,
             label=(file_label_2 if not any_right else None)
         )
         lines2.append(l3)
     if any_right and (y2R is not None):
         l4, = axR.plot(
-            X2_for_plot, y2R, linewidth=line_width, linestyle='-',
+            *plot_xy(X2_for_plot, y2R, decimate_for_plotting), linewidth=line_width, linestyle='-',
             color=color2
         )
         lines2.append(l4)
@@ -3,9 +3,13 @@ import matplotlib.pyplot as plt
 import numpy as np
 from tkinter import Tk
 from tkinter.filedialog import askopenfilename
-from scipy.interpolate import interp1d
 import os
 
+from csv_loader import read_csv_cached
+from resampling import float_dtype, resample_onto_grid
+from resample_cache import resample_files_cached
+from decimation import plot_xy
+
 # === SWITCHES ===
 custom_legend_names = True
 plotting_for_presentation = True
@@ -13,6 +17,10 @@ enable_dual_y_axes = False
 prompt_for_title = False
 xAxisLabelAutomatic = False   # <-- set to False to prompt for custom X-axis label
 compareGroupsOfGraphs = False  # <<< NEW: group pairs of graphs with shared colors/linestyles
+interpolation_method = 'linear'  # 'linear', 'nearest' or 'cubic'
+numeric_mmap = False             # All-numeric files: memory-mapped .npy columns instead of a parsed copy
+use_resample_cache = True      # Reuse resampled series from disk when files/columns/grid are unchanged
+decimate_for_plotting = True   # Draw a min-max reduced copy of long series (data itself untouched)
 
 
 def select_and_load_csv(prompt):
@@ -21,8 +29,12 @@ def select_and_load_csv(prompt):
     if not file_path:
         print("No file selected.")
         return None, None
-    df = pd.read_csv(file_path, sep=';')  # Assuming CSVs are comma-separated
-    return df, os.path.basename(file_path)
+    if use_resample_cache:
+        # Column names only; the data comes from the resample cache
+        df = pd.read_csv(file_path, sep=';', nrows=0)
+    else:
+        df = read_csv_cached(file_path, numeric_mmap=numeric_mmap, sep=';')  # Assuming CSVs are comma-separated
+    return df, file_path
 
 
 def choose_columns(df, label):
@@ -34,11 +46,6 @@ def choose_columns(df, label):
     return df.columns[x_index], df.columns[y_index]
 
 
-def interpolate_to_common_x(x_target, x, y):
-    f_interp = interp1d(x, y, bounds_error=False, fill_value=np.nan)
-    return f_interp(x_target)
-
-
 def compare_multiple_csvs():
     # Hide Tkinter root
     root = Tk()
@@ -54,11 +61,14 @@ def compare_multiple_csvs():
     y_cols = []
     legends = []
     filenames = []
+    paths = []
 
     for i in range(num_files):
-        df, filename = select_and_load_csv(f"Select CSV file {i + 1}")
+        df, file_path = select_and_load_csv(f"Select CSV file {i + 1}")
         if df is None:
             return
+        filename = os.path.basename(file_path)
+        paths.append(file_path)
         x_col, y_col = choose_columns(df, f"File {i + 1} ({filename})")
         dfs.append(df)
         x_cols.append(x_col)
@@ -79,17 +89,22 @@ def compare_multiple_csvs():
     y_label = input("Enter Y-axis label (e.g. 'Fuel burn rate'): ")
     y_units = input("Enter Y-axis units (e.g. 'mg/ms'): ")
 
-    # Base X and Y series
-    x_base = dfs[0][x_cols[0]].values
-    y_base = dfs[0][y_cols[0]].values
-
-    # Interpolate all series to the base X
-    y_all = [y_base]
-    for i in range(1, num_files):
-        x = dfs[i][x_cols[i]].values
-        y = dfs[i][y_cols[i]].values
-        y_interp = interpolate_to_common_x(x_base, x, y)
-        y_all.append(y_interp)
+    if use_resample_cache:
+        # Unchanged files/columns: no parsing, no interpolation
+        x_base, y_all = resample_files_cached(paths, x_cols, y_cols, interpolation_method, sep=';')
+    else:
+        # Base X and Y series
+        x_base = dfs[0][x_cols[0]].values
+        y_base = dfs[0][y_cols[0]].values
+
+        # Interpolate all series to the base X (one contiguous 2D array, row 0 = base)
+        y_all = np.empty((num_files, len(x_base)), dtype=float_dtype(*[dfs[i][y_cols[i]].values for i in range(num_files)]))
+        y_all[0] = y_base
+        y_all[1:] = resample_onto_grid(
+            x_base,
+            [(dfs[i][x_cols[i]].values, dfs[i][y_cols[i]].values) for i in range(1, num_files)],
+            interpolation_method,
+        )
 
     # === Grouping setup (for colors & linestyles) ===
     if compareGroupsOfGraphs:
@@ -139,7 +154,7 @@ def compare_multiple_csvs():
 
         if enable_dual_y_axes and ax2 and i == 1:
             ax2.plot(
-                x_base, y_all[i],
+                *plot_xy(x_base, y_all[i], decimate_for_plotting),
                 label=legends[i],
                 linewidth=line_width,
                 linestyle=linestyle,
@@ -147,7 +162,7 @@ def compare_multiple_csvs():
             )
         else:
             ax1.plot(
-                x_base, y_all[i],
+                *plot_xy(x_base, y_all[i], decimate_for_plotting),
                 label=legends[i],
                 linewidth=line_width,
                 linestyle=linestyle,
@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+
+MANIFEST_NAME = ".build_manifest.json"
+
+
+def file_digest(path, block_size=1 << 20):
+    """SHA-256 of the file content, read in blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_manifest(manifest_path):
+    """Return the manifest dict, or an empty one if missing/unreadable."""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest_path, manifest):
+    """Write the manifest atomically (temp file + rename)."""
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _key(path):
+    return os.path.abspath(path)
+
+
+def needs_rebuild(manifest, input_path, output_path):
+    """
+    True if input_path is new or changed since it was last built into
+    output_path, or if the output is missing.
+
+    Size and mtime are checked first; the content hash is only computed
+    when the mtime changed but the size did not (e.g. a touched file).
+    An unchanged hash refreshes the stored mtime so the next check is cheap.
+    """
+    entry = manifest.get(_key(input_path))
+    if entry is None or entry.get("output") != _key(output_path):
+        return True
+    if not os.path.exists(output_path):
+        return True
+
+    st = os.stat(input_path)
+    if st.st_size != entry["size"]:
+        return True
+    if st.st_mtime_ns == entry["mtime_ns"]:
+        return False
+
+    if file_digest(input_path) != entry["sha256"]:
+        return True
+    entry["mtime_ns"] = st.st_mtime_ns
+    return False
+
+
+def record_build(manifest, input_path, output_path):
+    """Store size, mtime, content hash and output path of a finished build."""
+    st = os.stat(input_path)
+    manifest[_key(input_path)] = {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha256": file_digest(input_path),
+        "output": _key(output_path),
+    }
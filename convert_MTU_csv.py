@@ -1,22 +1,49 @@
 import os
 import glob
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
 import pandas as pd
-from tkinter import Tk, filedialog
+
+from build_manifest import MANIFEST_NAME, load_manifest, needs_rebuild, record_build, save_manifest
 
 # ====== SETTINGS ======
 CRANK_COL_NAME     = "CrankAngleSensor"        # name of the crank angle column
 NEW_CRANK_COL_NAME = "CrankAngle [deg]"    # new modified crank angle column
+CYCLE_COL_NAME     = "Cycle [-]"           # per-row engine cycle number (multi-cycle unwrap)
 
 INPUT_DELIM  = ";"                       # current delimiter in your files
 OUTPUT_DELIM = ","                       # desired delimiter
 FILE_PATTERN = "*.csv"
 
+# only convert new or modified files (manifest kept in the output folder)
+INCREMENTAL_BUILD = True
+
 # how big a negative jump must be to be considered a wrap [deg]
 WRAP_JUMP_THRESHOLD = -300.0
+
+# unwrap EVERY wrap (multi-cycle recordings) and add the cycle number column;
+# set to False for the old behaviour (first wrap only)
+UNWRAP_ALL_CYCLES = True
+CYCLE_DEG = 720.0
+
+# stream files in chunks (flat memory for recordings of any length)
+CHUNKED_PROCESSING = False
+CHUNK_SIZE = 200_000                     # rows per chunk
+
+# parallel batch conversion (1 = sequential, in this process)
+NUM_WORKERS = os.cpu_count()
+
+# parse with a cached numeric schema (inferred once per header layout)
+USE_NUMERIC_SCHEMA = True
+SCHEMA_SAMPLE_ROWS = 10_000
 # =======================
 
 
 def ask_folder(title="Select folder"):
+    from tkinter import Tk, filedialog
+
     root = Tk()
     root.withdraw()
     folder = filedialog.askdirectory(title=title)
@@ -65,31 +92,218 @@ def adjust_crank_angle(series):
     return s
 
 
+def unwrap_crank_angle(series):
+    """
+    Vectorized unwrap of ALL crank angle wraps in one pass.
+
+    Every large negative jump (< WRAP_JUMP_THRESHOLD) starts a new cycle;
+    the cycle number is the cumulative count of jumps, and each row is
+    shifted by CYCLE_DEG * (cycle - 1). With a single wrap this gives the
+    same result as adjust_crank_angle() (rows before the wrap - 720,
+    rows after unchanged); every further cycle continues upwards.
+
+    If no wrap is detected, fall back to subtracting 720 from values > 720.
+
+    Returns (angle, cycle) as two Series aligned with the input.
+    """
+    values = series.to_numpy(dtype=float, copy=True)
+
+    jumps = np.zeros(len(values), dtype=np.int64)
+    jumps[1:] = np.diff(values) < WRAP_JUMP_THRESHOLD
+    cycle = np.cumsum(jumps)
+
+    _shift_by_cycle(values, cycle, has_wrap=bool(len(cycle) and cycle[-1] > 0))
+
+    return (pd.Series(values, index=series.index, name=series.name),
+            pd.Series(cycle, index=series.index, name=CYCLE_COL_NAME))
+
+
+def _shift_by_cycle(values, cycle, has_wrap):
+    """In place: apply the cycle offsets (or the > 720 fallback if the
+    whole recording has no wrap)."""
+    if has_wrap:
+        if UNWRAP_ALL_CYCLES:
+            values += CYCLE_DEG * (cycle - 1)
+        else:
+            # first wrap only (same as adjust_crank_angle)
+            values[cycle == 0] -= 720.0
+    else:
+        # fallback: simple wrap if angles go above 720
+        mask = values > 720.0
+        values[mask] -= 720.0
+
+
+# header (tuple of column names) -> {column: numeric dtype}
+_schema_cache = {}
+
+
+def infer_numeric_schema(in_path):
+    """
+    Numeric dtypes of the columns, inferred from the first SCHEMA_SAMPLE_ROWS
+    rows and cached per header, so a campaign of files with the same layout
+    is only sampled once. Non-numeric columns are left out.
+    """
+    header = tuple(pd.read_csv(in_path, sep=INPUT_DELIM, nrows=0).columns)
+    if header not in _schema_cache:
+        sample = pd.read_csv(in_path, sep=INPUT_DELIM, nrows=SCHEMA_SAMPLE_ROWS)
+        _schema_cache[header] = {col: dtype for col, dtype in sample.dtypes.items() if dtype.kind in "iuf"}
+    return header, _schema_cache[header]
+
+
+def read_mtu_file(in_path):
+    """
+    Read an MTU export straight into numeric dtypes using the cached schema.
+    If the sample was not representative (text or NaN further down in a
+    column), the parser raises and we fall back to normal dtype inference.
+    """
+    if not USE_NUMERIC_SCHEMA:
+        return pd.read_csv(in_path, sep=INPUT_DELIM)
+
+    header, schema = infer_numeric_schema(in_path)
+    try:
+        return pd.read_csv(in_path, sep=INPUT_DELIM, dtype=schema)
+    except (ValueError, TypeError, OverflowError):
+        _schema_cache.pop(header, None)
+        return pd.read_csv(in_path, sep=INPUT_DELIM)
+
+
 def remove_all_zero_rows(df):
     """
     Remove rows where all original numeric columns are zero.
-    Ignore the synthetic NEW_CRANK_COL_NAME when checking.
+    Ignore the synthetic NEW_CRANK_COL_NAME / CYCLE_COL_NAME when checking.
+
+    Numeric columns are reduced directly, one 2D array per dtype
+    (a single reduction when the frame is all float64); NaN counts as zero.
+    Only non-numeric columns go through pd.to_numeric.
+    """
+    cols_to_check = [c for c in df.columns if c not in (NEW_CRANK_COL_NAME, CYCLE_COL_NAME)]
+
+    by_dtype = {}
+    other_cols = []
+    for col in cols_to_check:
+        dtype = df[col].dtype
+        if dtype.kind in "iufb":
+            by_dtype.setdefault(dtype, []).append(col)
+        else:
+            other_cols.append(col)
+
+    keep = np.zeros(len(df), dtype=bool)
+    for dtype, cols in by_dtype.items():
+        block = df[cols].to_numpy()
+        if dtype.kind == "f":
+            # NaN compares False on both sides, i.e. counts as zero
+            keep |= ((block > 0.0) | (block < 0.0)).any(axis=1)
+        else:
+            keep |= (block != 0).any(axis=1)
+
+    for col in other_cols:
+        numeric = pd.to_numeric(df[col], errors="coerce").fillna(0.0)
+        keep |= (numeric != 0.0).to_numpy()
+
+    return df[keep]   # keep row if ANY numeric col is non-zero
+
+
+def scan_file(in_path):
+    """
+    Cheap pre-pass for the chunked pipeline, streamed in chunks.
+
+    Returns (has_wrap, dtypes) or None if the crank column is missing.
+    has_wrap decides between unwrap and fallback (a whole-file property),
+    dtypes are the column dtypes a whole-file read would infer, so every
+    chunk is parsed (and written) the same way as in the in-memory path.
     """
-    cols_to_check = df.columns.tolist()
-    if NEW_CRANK_COL_NAME in cols_to_check:
-        cols_to_check.remove(NEW_CRANK_COL_NAME)
+    has_wrap = False
+    last = np.nan
+    kinds = {}
+    for chunk in pd.read_csv(in_path, sep=INPUT_DELIM, chunksize=CHUNK_SIZE):
+        if CRANK_COL_NAME not in chunk.columns:
+            return None
+        if len(chunk) == 0:
+            # header-only file: the columns are all a whole-file read would see
+            for col in chunk.columns:
+                kinds.setdefault(col, "O")
+            continue
+
+        crank = chunk[CRANK_COL_NAME].to_numpy(dtype=float)
+        if not has_wrap:
+            has_wrap = bool((np.diff(crank, prepend=last) < WRAP_JUMP_THRESHOLD).any())
+        last = crank[-1]
+
+        for col, dtype in chunk.dtypes.items():
+            kind = dtype.kind if dtype.kind in "iuf" else "O"
+            prev = kinds.setdefault(col, kind)
+            if prev != kind:
+                kinds[col] = "f" if {prev, kind} <= set("iuf") else "O"
+
+    dtypes = {col: {"i": np.int64, "u": np.uint64, "f": np.float64}.get(k, object) for col, k in kinds.items()}
+    return has_wrap, dtypes
+
+
+def process_file_chunked(in_path, out_path):
+    """
+    Streaming version of process_file(): same output, flat memory.
+
+    The unwrap state (last crank angle, cycle count) is carried across
+    chunk boundaries and every filtered chunk is appended to out_path.
+    """
+    print(f"Processing (chunked): {os.path.basename(in_path)}")
+
+    scan = scan_file(in_path)
+    if scan is None:
+        print(f"  WARNING: column '{CRANK_COL_NAME}' not found, skipping.")
+        return False
+    has_wrap, dtypes = scan
+
+    last = np.nan
+    cycle_offset = 0
+    header = True
+    for chunk in pd.read_csv(in_path, sep=INPUT_DELIM, chunksize=CHUNK_SIZE, dtype=dtypes):
+        if len(chunk) == 0:
+            continue
+        values = chunk[CRANK_COL_NAME].to_numpy(dtype=float, copy=True)
+
+        jumps = np.diff(values, prepend=last) < WRAP_JUMP_THRESHOLD
+        cycle = cycle_offset + np.cumsum(jumps)
+        last = values[-1]
+        cycle_offset = cycle[-1]
+
+        _shift_by_cycle(values, cycle, has_wrap)
+        chunk[NEW_CRANK_COL_NAME] = values
+        if UNWRAP_ALL_CYCLES:
+            chunk[CYCLE_COL_NAME] = cycle
+
+        chunk = remove_all_zero_rows(chunk)
+        chunk.to_csv(out_path, sep=OUTPUT_DELIM, index=False, mode="w" if header else "a", header=header)
+        header = False
+
+    if header:
+        # no data rows at all: write the header only
+        columns = list(dtypes) + [NEW_CRANK_COL_NAME] + ([CYCLE_COL_NAME] if UNWRAP_ALL_CYCLES else [])
+        pd.DataFrame(columns=columns).to_csv(out_path, sep=OUTPUT_DELIM, index=False)
+
+    print(f"  Saved: {out_path}")
+    return True
 
-    numeric = df[cols_to_check].apply(pd.to_numeric, errors="coerce").fillna(0.0)
-    keep = (numeric != 0.0).any(axis=1)   # keep row if ANY numeric col is non-zero
-    return df[keep]
 
+def process_file(in_path, out_path, chunked=None):
+    if chunked is None:
+        chunked = CHUNKED_PROCESSING
+    if chunked:
+        return process_file_chunked(in_path, out_path)
 
-def process_file(in_path, out_path):
     print(f"Processing: {os.path.basename(in_path)}")
 
-    df = pd.read_csv(in_path, sep=INPUT_DELIM)
+    df = read_mtu_file(in_path)
 
     if CRANK_COL_NAME not in df.columns:
         print(f"  WARNING: column '{CRANK_COL_NAME}' not found, skipping.")
-        return
+        return False
 
     # compute modified crank angle
-    df[NEW_CRANK_COL_NAME] = adjust_crank_angle(df[CRANK_COL_NAME])
+    if UNWRAP_ALL_CYCLES:
+        df[NEW_CRANK_COL_NAME], df[CYCLE_COL_NAME] = unwrap_crank_angle(df[CRANK_COL_NAME])
+    else:
+        df[NEW_CRANK_COL_NAME] = adjust_crank_angle(df[CRANK_COL_NAME])
 
     # remove rows with all-zero original numeric data
     df = remove_all_zero_rows(df)
@@ -97,6 +311,80 @@ def process_file(in_path, out_path):
     # save with comma delimiter
     df.to_csv(out_path, sep=OUTPUT_DELIM, index=False)
     print(f"  Saved: {out_path}")
+    return True
+
+
+def _convert_worker(in_path, out_path, chunked):
+    """Run process_file() and report (ok, reason, seconds) instead of raising."""
+    t0 = time.perf_counter()
+    try:
+        ok = process_file(in_path, out_path, chunked)
+        reason = "" if ok else f"column '{CRANK_COL_NAME}' not found"
+    except Exception as e:
+        ok, reason = False, f"{type(e).__name__}: {e}"
+    return ok, reason, time.perf_counter() - t0
+
+
+def run_batch(input_folder, output_folder, workers=NUM_WORKERS, chunked=None):
+    """
+    Convert every FILE_PATTERN file of input_folder into output_folder,
+    spread over `workers` processes, with progress and a summary report.
+    """
+    if chunked is None:
+        chunked = CHUNKED_PROCESSING
+
+    files = sorted(glob.glob(os.path.join(input_folder, FILE_PATTERN)))
+    if not files:
+        print("No CSV files found in input folder.")
+        return
+
+    os.makedirs(output_folder, exist_ok=True)
+
+    manifest_path = os.path.join(output_folder, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path) if INCREMENTAL_BUILD else None
+
+    jobs = []
+    for f in files:
+        out_path = os.path.join(output_folder, os.path.basename(f))
+        if manifest is not None and not needs_rebuild(manifest, f, out_path):
+            continue
+        jobs.append((f, out_path))
+    skipped = len(files) - len(jobs)
+
+    t0 = time.perf_counter()
+    total_bytes = 0
+    failures = []
+
+    def finish(done, in_path, out_path, ok, reason, seconds):
+        nonlocal total_bytes
+        total_bytes += os.path.getsize(in_path)
+        status = "ok" if ok else f"FAILED ({reason})"
+        print(f"[{done}/{len(jobs)}] {os.path.basename(in_path)}: {status}, {seconds:.2f} s")
+        if ok:
+            if manifest is not None:
+                record_build(manifest, in_path, out_path)
+        else:
+            failures.append((in_path, reason))
+
+    if workers is None or workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_convert_worker, f, o, chunked): (f, o) for f, o in jobs}
+            for done, future in enumerate(as_completed(futures), start=1):
+                finish(done, *futures[future], *future.result())
+    else:
+        for done, (f, o) in enumerate(jobs, start=1):
+            finish(done, f, o, *_convert_worker(f, o, chunked))
+
+    if manifest is not None:
+        save_manifest(manifest_path, manifest)
+
+    elapsed = max(time.perf_counter() - t0, 1e-9)
+    print("\n====== SUMMARY ======")
+    print(f"Converted: {len(jobs) - len(failures)}, failed: {len(failures)}, skipped (unchanged): {skipped}")
+    print(f"Elapsed: {elapsed:.2f} s, {len(jobs) / elapsed:.2f} files/s, {total_bytes / 1e6 / elapsed:.1f} MB/s")
+    for in_path, reason in failures:
+        print(f"  FAILED {in_path}: {reason}")
+    return failures
 
 
 def main():
@@ -110,19 +398,25 @@ def main():
         print("Folder selection cancelled.")
         return
 
-    files = glob.glob(os.path.join(input_folder, FILE_PATTERN))
-    if not files:
-        print("No CSV files found in input folder.")
-        return
+    run_batch(input_folder, output_folder)
 
-    os.makedirs(output_folder, exist_ok=True)
+    print("\nDone!")
 
-    for f in files:
-        out_path = os.path.join(output_folder, os.path.basename(f))
-        process_file(f, out_path)
 
-    print("\nDone!")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert MTU ';' CSV exports (crank angle unwrap, zero-row removal).")
+    parser.add_argument("--input", help="input folder (omit to choose with a dialog)")
+    parser.add_argument("--output", help="output folder (omit to choose with a dialog)")
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS, help="number of worker processes")
+    parser.add_argument("--chunked", action="store_true", default=CHUNKED_PROCESSING,
+                        help="stream each file in chunks")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.input and args.output:
+        # headless, e.g. on compute nodes
+        run_batch(args.input, args.output, workers=args.workers, chunked=args.chunked)
+    else:
+        main()
@@ -1,8 +1,93 @@
 import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
-from tkinter import Tk, filedialog
+
+from build_manifest import MANIFEST_NAME, load_manifest, needs_rebuild, record_build, save_manifest
+
+# === SWITCHES ===
+incremental_build = True      # Only convert new or modified TXT files
+NUM_WORKERS = os.cpu_count()  # Parallel conversions (1 = sequential)
+
+
+def read_whitespace_txt(txt_path):
+    """
+    Read a whitespace-delimited (or space-aligned fixed-width) TXT file
+    with the compiled C parser. Ragged files (rows with more fields than
+    the header) are read again with the table widened to the longest row:
+    the extra columns are named col<N>, missing fields become NaN.
+    """
+    try:
+        return pd.read_csv(txt_path, sep=r"\s+", engine="c")
+    except pd.errors.ParserError:
+        with open(txt_path, "r", encoding="utf-8") as f:
+            header = f.readline().split()
+            width = max((len(line.split()) for line in f), default=0)
+        names = header + [f"col{i + 1}" for i in range(len(header), width)]
+        print(f"{os.path.basename(txt_path)}: ragged rows, read as {len(names)} columns")
+        return pd.read_csv(txt_path, sep=r"\s+", engine="c", header=None, skiprows=1, names=names)
+
+
+def convert_file(txt_path, csv_path):
+    # Read TXT with space (or multiple spaces) as delimiter
+    df = read_whitespace_txt(txt_path)
+
+    # Save as CSV with comma delimiter
+    df.to_csv(csv_path, index=False)
+
+
+def find_txt_files(folder_path, recursive=False):
+    if not recursive:
+        return [os.path.join(folder_path, f) for f in sorted(os.listdir(folder_path)) if f.endswith(".txt")]
+    return [os.path.join(d, f) for d, _, files in sorted(os.walk(folder_path)) for f in sorted(files)
+            if f.endswith(".txt")]
+
+
+def convert_folder(folder_path, recursive=False, workers=NUM_WORKERS):
+    manifest_path = os.path.join(folder_path, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path) if incremental_build else None
+
+    jobs = []
+    for txt_path in find_txt_files(folder_path, recursive):
+        # Create CSV filename
+        csv_path = os.path.splitext(txt_path)[0] + ".csv"
+        if manifest is not None and not needs_rebuild(manifest, txt_path, csv_path):
+            continue
+        jobs.append((txt_path, csv_path))
+    failures = []
+
+    def finish(txt_path, csv_path, error):
+        name = os.path.relpath(txt_path, folder_path)
+        if error is not None:
+            print(f"FAILED: {name} ({error})")
+            failures.append((txt_path, error))
+            return
+        print(f"Converted: {name} -> {os.path.basename(csv_path)}")
+        if manifest is not None:
+            record_build(manifest, txt_path, csv_path)
+
+    if workers is None or workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(convert_file, t, c): (t, c) for t, c in jobs}
+            for future in as_completed(futures):
+                finish(*futures[future], future.exception())
+    else:
+        for txt_path, csv_path in jobs:
+            try:
+                convert_file(txt_path, csv_path)
+                error = None
+            except Exception as e:
+                error = e
+            finish(txt_path, csv_path, error)
+
+    if manifest is not None:
+        save_manifest(manifest_path, manifest)
+    return failures
+
 
 def convert_txt_to_csv():
+    from tkinter import Tk, filedialog
+
     # Ask user to select the folder
     root = Tk()
     root.withdraw()  # Hide the main Tk window
@@ -12,22 +97,20 @@ def convert_txt_to_csv():
         print("No folder selected. Exiting.")
         return
 
-    # Loop through all files in the folder
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".txt"):
-            txt_path = os.path.join(folder_path, filename)
-
-            # Read TXT with space (or multiple spaces) as delimiter
-            df = pd.read_csv(txt_path, delimiter=r"\s+", engine="python")
+    convert_folder(folder_path)
 
-            # Create CSV filename
-            csv_filename = os.path.splitext(filename)[0] + ".csv"
-            csv_path = os.path.join(folder_path, csv_filename)
 
-            # Save as CSV with comma delimiter
-            df.to_csv(csv_path, index=False)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Convert whitespace-delimited TXT files to CSV.")
+    parser.add_argument("--input", help="folder with TXT files (omit to choose with a dialog)")
+    parser.add_argument("--recursive", action="store_true", help="also convert files in sub-folders")
+    parser.add_argument("--workers", type=int, default=NUM_WORKERS, help="number of worker processes")
+    return parser.parse_args(argv)
 
-            print(f"Converted: {filename} -> {csv_filename}")
 
 if __name__ == "__main__":
-    convert_txt_to_csv()
+    args = parse_args()
+    if args.input:
+        convert_folder(args.input, recursive=args.recursive, workers=args.workers)
+    else:
+        convert_txt_to_csv()
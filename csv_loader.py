@@ -0,0 +1,317 @@
+import hashlib
+import importlib.util
+import json
+import os
+import re
+import shutil
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from build_manifest import file_digest
+
+# === SETTINGS ===
+USE_SIDECAR_CACHE = True          # Write/read a binary columnar copy next to the source file
+CACHE_DIR_NAME = ".csv_cache"     # Sidecars live in <source folder>/.csv_cache/
+USE_NUMERIC_MMAP = False          # All-numeric files: one .npy per column, opened memory-mapped (read-only)
+NUMERIC_CHUNK_SIZE = 1_000_000    # rows per chunk while building the .npy columns
+DOWNCAST = False                  # float32 floats, smallest ints, categoricals for repetitive text (~half the memory)
+DOWNCAST_TOLERANCE = 1e-4         # max float32 error as a fraction of the column range; worse columns stay float64
+CATEGORY_MAX_RATIO = 0.5          # text columns with at most this share of distinct values become categoricals
+
+_UNIT_RE = re.compile(r"[\[(]([^\[\]()]*)[\])]\s*$")   # 'Pressure [bar]', 'Mass Cylinder 1 (kg)'
+
+# Feather (Arrow IPC) needs pyarrow; without it the sidecar is a pickle
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def _sidecar_paths(path, read_kwargs):
+    """(data path, meta path) of the sidecar for this source and read options."""
+    path = os.path.abspath(path)
+    key = json.dumps([path, sorted(read_kwargs.items())], default=repr)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    base = os.path.join(os.path.dirname(path), CACHE_DIR_NAME, f"{os.path.basename(path)}.{digest}")
+    return base + ".data", base + ".json"
+
+
+def _source_stamp(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _load_sidecar(data_path, meta_path, source_path, columns):
+    """Return the cached frame, or None if there is no valid sidecar."""
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get("source") != _source_stamp(source_path):
+        return None
+
+    if meta["format"] == "feather":
+        return pd.read_feather(data_path, columns=columns)
+    df = pd.read_pickle(data_path)
+    return df[columns] if columns is not None else df
+
+
+def _write_sidecar(df, data_path, meta_path, source_path):
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    tmp_path = f"{data_path}.{os.getpid()}.tmp"   # per process: parallel readers may cache the same file
+
+    fmt = "pickle"
+    if _HAS_PYARROW and isinstance(df.index, pd.RangeIndex) and df.index.start == 0 and df.index.step == 1:
+        try:
+            df.to_feather(tmp_path)
+            fmt = "feather"
+        except Exception:
+            pass   # e.g. mixed-type object columns: fall back to pickle
+    if fmt == "pickle":
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, data_path)
+
+    meta_tmp = f"{meta_path}.{os.getpid()}.tmp"
+    with open(meta_tmp, "w", encoding="utf-8") as f:
+        json.dump({"format": fmt, "source": _source_stamp(source_path)}, f)
+    os.replace(meta_tmp, meta_path)
+
+
+def _numeric_dir(path, read_kwargs):
+    data_path, _ = _sidecar_paths(path, read_kwargs)
+    return data_path[:-len(".data")] + ".npy"
+
+
+def _write_header(npy_dir, header):
+    tmp_path = os.path.join(npy_dir, f"header.json.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(header, f)
+    os.replace(tmp_path, os.path.join(npy_dir, "header.json"))
+
+
+def _read_header(npy_dir, source_path):
+    """The cache header if it still describes source_path, else None."""
+    try:
+        with open(os.path.join(npy_dir, "header.json"), "r", encoding="utf-8") as f:
+            header = json.load(f)
+    except (OSError, ValueError):
+        return None
+    stamp = _source_stamp(source_path)
+    if header["source"] == stamp:
+        return header
+    # Touched but same size (copied, checked out again): compare the content
+    if header["source"]["size"] == stamp["size"] and header["source_sha256"] == file_digest(source_path):
+        header["source"] = stamp
+        _write_header(npy_dir, header)
+        return header
+    return None
+
+
+def build_numeric_cache(path, npy_dir, chunk_size=NUMERIC_CHUNK_SIZE, **read_kwargs):
+    """
+    Parse `path` chunk by chunk into one float64 .npy file per column plus
+    header.json (columns, units, rows, source stamp and SHA-256), so the
+    file never has to fit in memory. A non-numeric column still gets a
+    header ("numeric": false), so the file is not parsed again just to fail.
+    """
+    tmp_dir = f"{npy_dir}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    columns = list(pd.read_csv(path, nrows=0, **read_kwargs).columns)
+    header = {"numeric": True, "columns": columns, "files": [f"{i:04d}.npy" for i in range(len(columns))],
+              "units": {c: m.group(1) for c in columns if (m := _UNIT_RE.search(str(c)))},
+              "dtype": "float64", "rows": 0,
+              "source": _source_stamp(path), "source_sha256": file_digest(path)}
+
+    raw_paths = [os.path.join(tmp_dir, f"{i:04d}.raw") for i in range(len(columns))]
+    raws = [open(raw_path, "wb") for raw_path in raw_paths]
+    try:
+        for chunk in pd.read_csv(path, chunksize=chunk_size, **read_kwargs):
+            for col, raw in zip(chunk.columns, raws):
+                if chunk[col].dtype.kind not in "biuf" and len(chunk):
+                    raise ValueError(f"column '{col}' is not numeric")
+                chunk[col].to_numpy(dtype=np.float64).tofile(raw)
+            header["rows"] += len(chunk)
+    except ValueError:
+        header = {"numeric": False, "source": header["source"], "source_sha256": header["source_sha256"]}
+    finally:
+        for raw in raws:
+            raw.close()
+
+    if header["numeric"]:
+        # .npy = small header + the raw bytes, so np.load(mmap_mode="r") maps the data directly
+        for raw_path, name in zip(raw_paths, header["files"]):
+            with open(os.path.join(tmp_dir, name), "wb") as out, open(raw_path, "rb") as raw:
+                np.lib.format.write_array_header_1_0(
+                    out, {"descr": "<f8", "fortran_order": False, "shape": (header["rows"],)})
+                shutil.copyfileobj(raw, out, 1 << 20)
+    for raw_path in raw_paths:
+        os.remove(raw_path)
+    _write_header(tmp_dir, header)
+
+    shutil.rmtree(npy_dir, ignore_errors=True)
+    try:
+        os.replace(tmp_dir, npy_dir)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)   # a parallel build got there first
+    return header
+
+
+def read_numeric_mmap(path, usecols=None, **read_kwargs):
+    """
+    All-numeric CSV as a DataFrame whose float64 columns are read-only
+    memory maps of the cached .npy files: opening is nearly instant and
+    nothing is copied into RAM until it is used, so traces larger than
+    memory work. Units found in the column names ('P [bar]') are in
+    df.attrs["units"]. Raises ValueError for files with text columns.
+    """
+    npy_dir = _numeric_dir(path, read_kwargs)
+    header = _read_header(npy_dir, path)
+    if header is None:
+        header = build_numeric_cache(path, npy_dir, **read_kwargs)
+    if not header["numeric"]:
+        raise ValueError(f"{path} has non-numeric columns")
+
+    files = dict(zip(header["columns"], header["files"]))
+    columns = header["columns"] if usecols is None else list(usecols)
+    if all(isinstance(c, int) for c in columns):
+        columns = [header["columns"][i] for i in columns]
+    df = pd.DataFrame({c: np.load(os.path.join(npy_dir, files[c]), mmap_mode="r") for c in columns},
+                      copy=False)
+    df.attrs["units"] = {c: u for c, u in header["units"].items() if c in df.columns}
+    return df
+
+
+def iter_numeric_chunks(path, chunk_size, usecols=None, **read_kwargs):
+    """Like pd.read_csv(chunksize=...), but the chunks are views of the memory-mapped columns."""
+    df = read_numeric_mmap(path, usecols, **read_kwargs)
+    arrays = {c: df[c].to_numpy() for c in df.columns}
+    for start in range(0, len(df), chunk_size):
+        stop = min(start + chunk_size, len(df))
+        # a new frame per chunk (not df.iloc), so callers may add columns to it
+        yield pd.DataFrame({c: a[start:stop] for c, a in arrays.items()},
+                           index=pd.RangeIndex(start, stop), copy=False)
+
+
+def _error_scale(values):
+    """
+    What the float32 rounding error of a column is measured against. For
+    axis-like columns (time, crank angle: monotonic, or monotonic between
+    wraps/resets) it is the smallest step, which Differentiate, Integrate
+    and the resampling depend on; for anything else, the range.
+    """
+    steps = np.diff(values)
+    steps = steps[np.isfinite(steps) & (steps != 0)]
+    if len(steps):
+        forward = steps > 0 if np.count_nonzero(steps > 0) >= len(steps) / 2 else steps < 0
+        backward = np.abs(steps[~forward])
+        # wraps/resets: rare and much larger than a typical step
+        if len(backward) <= 0.01 * len(steps) and (
+                not len(backward) or backward.min() > 100 * np.median(np.abs(steps))):
+            return np.abs(steps[forward]).min()
+    scale = np.nanmax(values) - np.nanmin(values)
+    return scale if scale > 0 else np.nanmax(np.abs(values))
+
+
+def downcast_frame(df, tolerance=DOWNCAST_TOLERANCE, max_ratio=CATEGORY_MAX_RATIO):
+    """
+    df with smaller dtypes: float64 -> float32, ints -> the smallest int
+    type (lossless), low-cardinality text -> category. A float column whose
+    float32 rounding error exceeds `tolerance` times its smallest step
+    (time/angle axes, e.g. long unwrapped recordings) or its range (other
+    columns, e.g. large offsets with small variations) stays float64 and is
+    reported. Returns (df, {column: relative error}) of the kept columns.
+    """
+    columns = {}
+    kept = {}
+    for col in df.columns:
+        s = df[col]
+        if s.dtype.kind == "f" and s.dtype.itemsize > 4:
+            values = s.to_numpy()
+            single = values.astype(np.float32)
+            with warnings.catch_warnings(), np.errstate(invalid="ignore", over="ignore"):
+                warnings.simplefilter("ignore", RuntimeWarning)   # all-NaN columns
+                error = np.nanmax(np.abs(single - values)) if len(values) else 0.0
+                scale = _error_scale(values) if len(values) else 0.0
+            relative = error / scale if scale > 0 else (np.inf if error > 0 else 0.0)
+            if relative > tolerance:
+                kept[col] = float(relative)
+                columns[col] = s
+            else:
+                columns[col] = pd.Series(single, index=df.index, name=col)
+        elif s.dtype.kind in "iu":
+            columns[col] = pd.to_numeric(s, downcast="integer" if s.dtype.kind == "i" else "unsigned")
+        elif pd.api.types.is_string_dtype(s.dtype) and len(s) and s.nunique(dropna=False) <= max_ratio * len(s):
+            columns[col] = s.astype("category")
+        else:
+            columns[col] = s
+
+    out = pd.DataFrame(columns, index=df.index, copy=False)
+    out.attrs = df.attrs
+    if kept:
+        print(f"Kept float64 for {len(kept)} column(s), float32 error above {tolerance:g} of the step/range: "
+              + ", ".join(f"{col} ({err:.1e})" for col, err in kept.items()))
+    return out, kept
+
+
+def read_csv_cached(path, usecols=None, numeric_mmap=None, downcast=None, **read_kwargs):
+    """
+    pd.read_csv() with a binary sidecar cache.
+
+    The first read parses the text file and writes a Feather (or pickle)
+    copy to <folder>/.csv_cache/; later reads with the same options load
+    that copy as long as the source size and mtime are unchanged.
+    `usecols` (names or positions) projects columns, returned in the
+    `usecols` order: only those are parsed and cached, and a full-file
+    copy, if there is one, serves them too. With numeric_mmap (default
+    USE_NUMERIC_MMAP), all-numeric files come back memory-mapped, see
+    read_numeric_mmap(). With downcast (default DOWNCAST) the frame is
+    returned with smaller dtypes, see downcast_frame(); the cache itself
+    keeps full precision. Memory-mapped frames are not downcast: they
+    are not held in RAM.
+    """
+    if USE_SIDECAR_CACHE and (USE_NUMERIC_MMAP if numeric_mmap is None else numeric_mmap) and not callable(usecols):
+        try:
+            return read_numeric_mmap(path, usecols, **read_kwargs)
+        except ValueError:
+            pass   # text columns: use the Feather/pickle sidecar
+
+    df = _read_csv_sidecar(path, usecols, read_kwargs)
+    if DOWNCAST if downcast is None else downcast:
+        df, _ = downcast_frame(df)
+    return df
+
+
+def _read_csv_sidecar(path, usecols, read_kwargs):
+    if callable(usecols):
+        return pd.read_csv(path, usecols=usecols, **read_kwargs)
+
+    columns = None
+    if usecols is not None:
+        columns = list(dict.fromkeys(usecols))
+        if all(isinstance(c, int) for c in columns):
+            header = pd.read_csv(path, nrows=0, **read_kwargs).columns
+            columns = [header[i] for i in columns]
+    if not USE_SIDECAR_CACHE:
+        df = pd.read_csv(path, usecols=columns, **read_kwargs)
+        return df[columns] if columns is not None else df   # usecols keeps file order
+
+    # A full-file sidecar serves every projection; otherwise each projection has its own
+    sidecars = [_sidecar_paths(path, read_kwargs)]
+    if columns is not None:
+        sidecars.append(_sidecar_paths(path, {**read_kwargs, "usecols": columns}))
+    for data_path, meta_path in sidecars:
+        try:
+            df = _load_sidecar(data_path, meta_path, path, columns)
+            if df is not None:
+                return df[columns] if columns is not None else df
+        except Exception:
+            pass   # unreadable sidecar (or without these columns): rebuild it
+
+    # Parse only the requested columns
+    df = pd.read_csv(path, usecols=columns, **read_kwargs)
+    try:
+        _write_sidecar(df, *sidecars[-1], path)
+    except OSError as e:
+        print(f"Could not write CSV cache for {path}: {e}")
+    return df[columns] if columns is not None else df
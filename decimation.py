@@ -0,0 +1,95 @@
+import warnings
+
+import numpy as np
+
+# === SETTINGS ===
+DEFAULT_POINTS = 4000          # ~ a few points per pixel of a full-width figure
+DEFAULT_METHOD = "minmax"      # 'minmax' keeps each bin's min/max envelope, 'lttb' keeps the shape
+
+
+def minmax_indices(y, n_bins):
+    """
+    Indices of the first, min, max and last sample of each of n_bins
+    equal-count bins (sorted, unique). The min/max envelope of every bin
+    is kept exactly, including the global extremes; smaller extremes that
+    share a bin with a larger one are dropped. An all-NaN bin keeps its
+    first sample, so gaps stay gaps.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    width = -(-n // n_bins)                    # ceil
+    n_bins = -(-n // width)
+    padded = np.full(n_bins * width, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_bins, width)
+
+    # nanarg* raise on all-NaN rows: those bins resolve to their first sample
+    all_nan = np.isnan(blocks).all(axis=1)
+    filled = np.where(all_nan[:, None], 0.0, blocks)
+    arg_min = np.nanargmin(filled, axis=1)
+    arg_max = np.nanargmax(filled, axis=1)
+
+    starts = np.arange(n_bins) * width
+    last = np.minimum(starts + width, n) - 1
+    idx = np.concatenate((starts, starts + arg_min, starts + arg_max, last))
+    return np.unique(idx[idx < n])
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: keep the first and last point and, per
+    bucket, the point forming the largest triangle with the previously kept
+    point and the mean of the next bucket. One vectorized step per bucket.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+
+    a = 0
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", "Mean of empty slice", RuntimeWarning)   # all-NaN buckets
+        for i in range(n_out - 2):
+            lo, hi = edges[i], max(edges[i + 1], edges[i] + 1)
+            if i + 2 < len(edges):
+                next_lo, next_hi = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            else:
+                next_lo, next_hi = n - 1, n
+            cx = np.nanmean(x[next_lo:next_hi])
+            cy = np.nanmean(y[next_lo:next_hi])
+
+            area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+            a = lo + (int(np.nanargmax(area)) if not np.isnan(area).all() else 0)
+            idx[i + 1] = a
+    return np.unique(idx)
+
+
+def _is_numeric(a):
+    return a.dtype.kind in "biuf"
+
+
+def decimate(x, y, n_points=DEFAULT_POINTS, method=DEFAULT_METHOD):
+    """
+    Reduce (x, y) to about n_points samples for plotting.
+    'minmax' (default) keeps each bin's min/max envelope; 'lttb' keeps the
+    shape. Short series and non-numeric y (text, categories) are returned
+    unchanged.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(y) <= n_points or not _is_numeric(y):
+        return x, y
+    if method == "lttb" and _is_numeric(x):
+        idx = lttb_indices(x, y, n_points)
+    else:
+        idx = minmax_indices(y, max(n_points // 4, 1))
+    return x[idx], y[idx]
+
+
+def plot_xy(x, y, enabled=True, n_points=DEFAULT_POINTS, method=DEFAULT_METHOD):
+    """(x, y) as drawn: decimated to n_points when enabled (a plotter's decimate_for_plotting switch)."""
+    if enabled:
+        return decimate(x, y, n_points, method)
+    return x, y
@@ -5,12 +5,16 @@ from tkinter.filedialog import askopenfilename
 import os
 import re
 
+from csv_loader import read_csv_cached
+from decimation import plot_xy
+
 
 # === SWITCHES ===
 custom_legend_names = False
 plotting_for_presentation = True
 enable_dual_y_axes = False  # Enable separate y-axis on the right side
 custom_title = True
+decimate_for_plotting = True  # Draw a min-max reduced copy of long series (data itself untouched)
 
 def plot_from_csv():
     # Create a Tkinter root window (hidden)
@@ -36,9 +40,9 @@ def plot_from_csv():
     try:
         try:
             if file_ext == ".csv":
-                df = pd.read_csv(file_path, delimiter=delim)  # or ',' if that's your CSV format
+                df = read_csv_cached(file_path, delimiter=delim)  # or ',' if that's your CSV format
             elif file_ext == ".txt":
-                df = pd.read_csv(file_path, sep=r'\s+', engine='python')  # handle whitespace
+                df = read_csv_cached(file_path, sep=r'\s+', engine='python')  # handle whitespace
             else:
                 raise ValueError("Unsupported file type.")
         except Exception as e:
@@ -91,7 +95,7 @@ def plot_from_csv():
 
         for idx, (col, legend) in enumerate(zip(left_y_cols, left_legends)):
             color = left_colors[idx % len(left_colors)]
-            ax1.plot(df[x_col], df[col], label=legend, linewidth=line_width, color=color)
+            ax1.plot(*plot_xy(df[x_col].to_numpy(), df[col].to_numpy(), decimate_for_plotting), label=legend, linewidth=line_width, color=color)
 
         ax1.set_ylabel(f"{left_label} [{left_units}]")
         ax1.set_xlabel(x_col)
@@ -112,7 +116,7 @@ def plot_from_csv():
 
             for idx, (col, legend) in enumerate(zip(right_y_cols, right_legends)):
                 color = right_colors[idx % len(right_colors)]
-                ax2.plot(df[x_col], df[col], label=legend, linewidth=line_width, color=color, linestyle='--')
+                ax2.plot(*plot_xy(df[x_col].to_numpy(), df[col].to_numpy(), decimate_for_plotting), label=legend, linewidth=line_width, color=color, linestyle='--')
 
             ax2.set_ylabel(f"{right_label} [{right_units}]")
 
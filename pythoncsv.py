@@ -0,0 +1,267 @@
+"""
+One command for all the scripts:
+
+    python pythoncsv.py <subcommand> [options]
+
+Every subcommand imports its script (and pandas, matplotlib, scipy, tkinter)
+only when it runs, so light subcommands like 'catalog' and 'fixcomma'
+start without them. Without file/folder arguments a subcommand falls back
+to the script's interactive dialogs.
+"""
+import argparse
+import sys
+
+
+def cmd_clean(args):
+    import CSV_CleanUp
+    if not args.file:
+        return CSV_CleanUp.delete_selected_columns()
+    import pandas as pd
+    columns = pd.read_csv(args.file, nrows=0).columns
+    keep = [col for col in columns if col not in args.drop]
+    rows = CSV_CleanUp.copy_columns_in_chunks(args.file, args.output, keep)
+    print(f"Cleaned file saved to: {args.output} ({rows} rows)")
+
+
+def cmd_extract(args):
+    import ExtractRelevantColumns
+    if not args.file:
+        return ExtractRelevantColumns.keep_selected_columns()
+    rows = ExtractRelevantColumns.extract_columns(args.file, args.output, args.keep, sep=args.sep)
+    print(f"Filtered file saved to: {args.output} ({rows} rows)")
+
+
+def cmd_dedup(args):
+    import DeleteDuplicates
+    if args.file:
+        DeleteDuplicates.filename = args.file
+    if args.external:
+        DeleteDuplicates.external_memory_dedup = True
+    if args.tolerance is not None:
+        DeleteDuplicates.tolerance_dedup = True
+        DeleteDuplicates.TOLERANCE = args.tolerance
+    DeleteDuplicates.main(args.keys)
+
+
+def cmd_fixcomma(args):
+    from pathlib import Path
+    import Convert_2nd_comma_into_point as fixer
+    fixer.data_dir = Path(args.dir)
+    fixer.NUM_WORKERS = args.workers or fixer.NUM_WORKERS
+    if args.lines:
+        fixer.use_mmap_fast_path = False
+    if args.all:
+        fixer.incremental_build = False
+    fixer.main()
+
+
+def cmd_mtu(args):
+    import convert_MTU_csv
+    if not (args.input and args.output):
+        return convert_MTU_csv.main()
+    failures = convert_MTU_csv.run_batch(args.input, args.output, workers=args.workers, chunked=args.chunked)
+    return 1 if failures else 0
+
+
+def cmd_txt2csv(args):
+    import convert_txt_to_csv
+    if not args.input:
+        return convert_txt_to_csv.convert_txt_to_csv()
+    failures = convert_txt_to_csv.convert_folder(args.input, recursive=args.recursive, workers=args.workers)
+    return 1 if failures else 0
+
+
+def cmd_diff(args):
+    import Differentiate
+    for name in ("filename", "time_col", "value_cols"):
+        if getattr(args, name) is not None:
+            setattr(Differentiate, name, getattr(args, name))
+    Differentiate.second_order_edges |= args.second_order_edges
+    Differentiate.nonuniform_interior |= args.nonuniform
+    Differentiate.chunked |= args.chunked
+    Differentiate.numeric_mmap |= args.mmap
+    Differentiate.main()
+
+
+def cmd_integrate(args):
+    import Integrate
+    if args.patterns:
+        Integrate.file_patterns = args.patterns
+    for name in ("x_col", "value_cols", "method", "cycle_col"):
+        if getattr(args, name) is not None:
+            setattr(Integrate, name, getattr(args, name))
+    Integrate.reset_per_cycle |= args.reset_per_cycle
+    Integrate.main()
+
+
+def cmd_merge(args):
+    import MergeCSVfilesForComparison as merge
+    if not args.files:
+        return merge.merge_n_csvs_nearest() if merge.nearest_merge_mode else merge.merge_csv_on_time_with_suffix_and_spacer()
+    if len(args.files) < 2 or not args.output:
+        sys.exit("merge: give at least 2 files and --output")
+    merge.TIME_COL = args.time_col
+    suffixes = args.suffixes or [f"_{i + 1}" for i in range(len(args.files))]
+    if len(suffixes) != len(args.files):
+        sys.exit("merge: one suffix per file")
+    rows = merge.merge_csvs_nearest(args.files, suffixes, args.output, args.tolerance, args.direction)
+    print(f"Merged file saved to: {args.output} ({rows} rows)")
+
+
+PLOT_ENTRY_POINTS = {
+    "general": ("plotGeneralCSV", "plot_from_csv"),
+    "compare": ("PlotCSV_w_interpolation", "compare_two_csvs"),
+    "multi": ("PlotCSV_w_interpolation_MultipleFiles", "compare_multiple_csvs"),
+    "folder": ("PlotCSV_MultipleFiles_sameColumn_auto", "compare_csvs_from_folder"),
+}
+
+
+def cmd_plot(args):
+    if args.job:
+        import BatchPlot
+        failures = BatchPlot.run_jobs(args.job, workers=args.workers or BatchPlot.NUM_WORKERS, only=args.only)
+        return 1 if failures else 0
+    import importlib
+    module_name, function_name = PLOT_ENTRY_POINTS[args.mode]
+    getattr(importlib.import_module(module_name), function_name)()
+
+
+def cmd_catalog(args):
+    import ListFilesInFolder
+    if not args.folder:
+        return ListFilesInFolder.list_files_in_folder()
+    failed = ListFilesInFolder.build_catalog(args.folder, args.catalog, recursive=not args.flat,
+                                             workers=args.workers or ListFilesInFolder.NUM_WORKERS)
+    return 1 if failed else 0
+
+
+def cmd_ops(args):
+    import CSV_ColumnOperations as ops
+    if not args.file:
+        return ops.column_operation()
+    if not args.expr:
+        sys.exit("ops: give at least one --expr 'name = expression'")
+    ops.NUMERIC_MMAP |= args.mmap
+    import pandas as pd
+    try:
+        formulas = ops.parse_formulas(args.expr, pd.read_csv(args.file, nrows=0).columns)
+    except (ValueError, SyntaxError) as e:
+        sys.exit(f"ops: invalid formula: {e}")
+    try:
+        rows = ops.apply_formulas_chunked(args.file, args.output, formulas)
+    except ValueError as e:
+        sys.exit(f"ops: {e}")
+    print(f"Derived {[name for name, _ in formulas]} for {rows} rows, saved to: {args.output}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="pythoncsv", description="CSV cleaning, conversion, analysis and plotting.")
+    parser.add_argument("--downcast", action="store_true",
+                        help="load data as float32/categoricals where the precision loss is negligible")
+    sub = parser.add_subparsers(dest="command", metavar="<subcommand>", required=True)
+
+    p = sub.add_parser("clean", help="delete columns (CSV_CleanUp)")
+    p.add_argument("file", nargs="?")
+    p.add_argument("--drop", nargs="+", default=[], metavar="COL", help="columns to delete")
+    p.add_argument("-o", "--output", help="output CSV")
+    p.set_defaults(func=cmd_clean, needs_output=True)
+
+    p = sub.add_parser("extract", help="keep selected columns (ExtractRelevantColumns)")
+    p.add_argument("file", nargs="?")
+    p.add_argument("--keep", nargs="+", default=[], metavar="COL", help="columns to keep, in output order")
+    p.add_argument("--sep", default=";", help="input delimiter (default ';')")
+    p.add_argument("-o", "--output", help="output CSV")
+    p.set_defaults(func=cmd_extract, needs_output=True)
+
+    p = sub.add_parser("dedup", help="remove duplicate rows (DeleteDuplicates)")
+    p.add_argument("file", nargs="?", help="CSV or XLSX (default: the script's filename)")
+    p.add_argument("--keys", nargs="+", metavar="COL", help="key columns (omit to choose interactively)")
+    p.add_argument("--external", action="store_true", help="out-of-core hash-partitioned dedup")
+    p.add_argument("--tolerance", type=float, help="near-duplicates on the first key column")
+    p.set_defaults(func=cmd_dedup)
+
+    p = sub.add_parser("fixcomma", help="second comma -> decimal point (Convert_2nd_comma_into_point)")
+    p.add_argument("--dir", default="./data", help="folder with the CSV files (default ./data)")
+    p.add_argument("--workers", type=int, help="number of worker processes")
+    p.add_argument("--lines", action="store_true", help="line-by-line fixer instead of the mmap fast path")
+    p.add_argument("--all", action="store_true", help="reprocess unchanged files too")
+    p.set_defaults(func=cmd_fixcomma)
+
+    p = sub.add_parser("mtu", help="convert MTU exports (convert_MTU_csv)")
+    p.add_argument("--input", help="input folder")
+    p.add_argument("--output", help="output folder")
+    p.add_argument("--workers", type=int, help="number of worker processes")
+    p.add_argument("--chunked", action="store_true", help="stream each file in chunks")
+    p.set_defaults(func=cmd_mtu)
+
+    p = sub.add_parser("txt2csv", help="whitespace TXT -> CSV (convert_txt_to_csv)")
+    p.add_argument("--input", help="folder with TXT files")
+    p.add_argument("--recursive", action="store_true", help="also convert files in sub-folders")
+    p.add_argument("--workers", type=int, help="number of worker processes")
+    p.set_defaults(func=cmd_txt2csv)
+
+    p = sub.add_parser("diff", help="differentiate columns (Differentiate)")
+    p.add_argument("filename", nargs="?")
+    p.add_argument("--time-col")
+    p.add_argument("--value-cols", nargs="+", metavar="COL")
+    p.add_argument("--second-order-edges", action="store_true")
+    p.add_argument("--nonuniform", action="store_true", help="2nd-order non-uniform interior stencil")
+    p.add_argument("--chunked", action="store_true", help="out-of-core, chunk by chunk")
+    p.add_argument("--mmap", action="store_true", help="read through the memory-mapped .npy column cache")
+    p.set_defaults(func=cmd_diff)
+
+    p = sub.add_parser("integrate", help="cumulative integrals (Integrate)")
+    p.add_argument("patterns", nargs="*", help="files or glob patterns")
+    p.add_argument("--x-col")
+    p.add_argument("--value-cols", nargs="+", metavar="COL")
+    p.add_argument("--method", choices=("trapezoid", "simpson"))
+    p.add_argument("--reset-per-cycle", action="store_true")
+    p.add_argument("--cycle-col")
+    p.set_defaults(func=cmd_integrate)
+
+    p = sub.add_parser("merge", help="nearest/as-of merge on time (MergeCSVfilesForComparison)")
+    p.add_argument("files", nargs="*", help="CSV files sorted by time; the first one is the reference")
+    p.add_argument("--suffixes", nargs="+", help="one column suffix per file (default _1, _2, ...)")
+    p.add_argument("--time-col", default="time")
+    p.add_argument("--tolerance", type=float)
+    p.add_argument("--direction", default="nearest", choices=("nearest", "backward", "forward"))
+    p.add_argument("-o", "--output", help="output CSV")
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser("plot", help="interactive plotters, or headless rendering of a job file (BatchPlot)")
+    p.add_argument("mode", nargs="?", default="general", choices=sorted(PLOT_ENTRY_POINTS))
+    p.add_argument("--job", help="JSON job file: render headless instead")
+    p.add_argument("--workers", type=int, help="number of worker processes (with --job)")
+    p.add_argument("--only", nargs="+", metavar="NAME", help="render only these figures (with --job)")
+    p.set_defaults(func=cmd_plot)
+
+    p = sub.add_parser("catalog", help="catalog the files of a folder (ListFilesInFolder)")
+    p.add_argument("folder", nargs="?")
+    p.add_argument("--catalog", help="catalog path (default <folder>/file_catalog.csv)")
+    p.add_argument("--flat", action="store_true", help="do not scan sub-folders")
+    p.add_argument("--workers", type=int, help="number of worker processes")
+    p.set_defaults(func=cmd_catalog)
+
+    p = sub.add_parser("ops", help="column arithmetic and formulas (CSV_ColumnOperations)")
+    p.add_argument("file", nargs="?")
+    p.add_argument("-e", "--expr", action="append", default=[], metavar="'name = expression'")
+    p.add_argument("--mmap", action="store_true", help="read through the memory-mapped .npy column cache")
+    p.add_argument("-o", "--output", help="output CSV")
+    p.set_defaults(func=cmd_ops, needs_output=True)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "needs_output", False) and args.file and not args.output:
+        parser.error(f"{args.command}: --output is required with a file argument")
+    if args.downcast:
+        import csv_loader
+        csv_loader.DOWNCAST = True
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+import csv_loader
+from build_manifest import file_digest
+from csv_loader import read_csv_cached
+from resampling import resample_onto_grid
+
+# === SETTINGS ===
+RESAMPLE_CACHE_DIR = ".resample_cache"      # entries live in <source folder>/.resample_cache/
+MAX_CACHE_BYTES = 2 * 1024**3                # LRU eviction above this size (per cache folder)
+
+_DIGEST_INDEX = "digests.json"
+
+
+def _cache_dir(source_path):
+    """<source folder>/.resample_cache, like csv_loader's .csv_cache."""
+    cache_dir = os.path.join(os.path.dirname(os.path.abspath(source_path)), RESAMPLE_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+def source_digest(path):
+    """Content hash of a source file, memoized by path, size and mtime."""
+    index_path = os.path.join(_cache_dir(path), _DIGEST_INDEX)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+
+    st = os.stat(path)
+    stamp = [st.st_size, st.st_mtime_ns]
+    entry = index.get(os.path.abspath(path))
+    if entry is not None and entry["stamp"] == stamp:
+        return entry["sha256"]
+
+    digest = file_digest(path)
+    index[os.path.abspath(path)] = {"stamp": stamp, "sha256": digest}
+    with open(index_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(index_path + ".tmp", index_path)
+    return digest
+
+
+def array_digest(values):
+    return hashlib.sha256(np.ascontiguousarray(values, dtype=np.float64).tobytes()).hexdigest()
+
+
+def _read_options(read_kwargs):
+    """Read options as they affect the values, with the downcast flag resolved (float32 rounding)."""
+    options = dict(read_kwargs)
+    if options.get("downcast") is None:
+        options["downcast"] = csv_loader.DOWNCAST
+    return sorted(options.items())
+
+
+def _key(*parts):
+    return hashlib.sha256(json.dumps(parts, default=repr).encode("utf-8")).hexdigest()
+
+
+def _load(cache_dir, key):
+    path = os.path.join(cache_dir, key + ".npy")
+    try:
+        values = np.load(path)
+    except (OSError, ValueError):
+        return None
+    os.utime(path)   # mark as recently used
+    return values
+
+
+def _store(cache_dir, key, values):
+    path = os.path.join(cache_dir, key + ".npy")
+    tmp_path = f"{path}.{os.getpid()}.tmp.npy"   # per process: parallel renders may store the same series
+    np.save(tmp_path, values)
+    os.replace(tmp_path, path)
+    evict(cache_dir)
+
+
+def evict(cache_dir, max_bytes=None):
+    """Delete least recently used entries until cache_dir fits in max_bytes (default MAX_CACHE_BYTES)."""
+    if max_bytes is None:
+        max_bytes = MAX_CACHE_BYTES
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.endswith(".npy"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(path)
+        total -= size
+
+
+def cached_column(path, column, **read_kwargs):
+    """One column of a CSV as float64, cached by source content hash."""
+    key = _key("column", source_digest(path), column, _read_options(read_kwargs))
+    cache_dir = _cache_dir(path)
+    values = _load(cache_dir, key)
+    if values is None:
+        values = read_csv_cached(path, usecols=[column], **read_kwargs)[column].to_numpy(dtype=np.float64)
+        _store(cache_dir, key, values)
+    return values
+
+
+def cached_resample(path, x_col, y_col, x_target, method="linear", grid_digest=None, **read_kwargs):
+    """
+    y_col(x_col) of a CSV resampled onto x_target, cached by source content
+    hash, column names, target grid hash, method and read options.
+    """
+    grid_digest = grid_digest or array_digest(x_target)
+    key = _key("resample", source_digest(path), x_col, y_col, grid_digest, method, _read_options(read_kwargs))
+    cache_dir = _cache_dir(path)
+    values = _load(cache_dir, key)
+    if values is None:
+        df = read_csv_cached(path, usecols=[x_col, y_col], **read_kwargs)
+        values = resample_onto_grid(x_target, [(df[x_col].to_numpy(), df[y_col].to_numpy())], method,
+                                    dtype=np.float64)[0]
+        _store(cache_dir, key, values)
+    return values
+
+
+def resample_files_cached(paths, x_cols, y_cols, method="linear", **read_kwargs):
+    """
+    Base grid (x of the first file) and all series on it as one (N, M)
+    array, row 0 being the first file itself. On a repeated comparison
+    nothing is parsed or interpolated, only .npy files are loaded.
+    """
+    x_base = cached_column(paths[0], x_cols[0], **read_kwargs)
+    grid_digest = array_digest(x_base)
+
+    y_all = np.empty((len(paths), len(x_base)))
+    y_all[0] = cached_column(paths[0], y_cols[0], **read_kwargs)
+    for i in range(1, len(paths)):
+        y_all[i] = cached_resample(paths[i], x_cols[i], y_cols[i], x_base, method, grid_digest, **read_kwargs)
+    return x_base, y_all
@@ -0,0 +1,89 @@
+import numpy as np
+
+METHODS = ("linear", "nearest", "cubic")
+BLOCK_SIZE = 1 << 20   # target points per block (bounds the temporaries)
+
+
+def float_dtype(*arrays):
+    """float32 if every array already is float32 (downcast loads), else float64."""
+    return np.float32 if all(np.asarray(a).dtype == np.float32 for a in arrays) else np.float64
+
+
+def bracket(x_sorted, x_target, method="linear"):
+    """
+    Precomputed lookup of x_target in x_sorted, reusable for every series
+    sampled on the same x. Same conventions as scipy's interp1d
+    (bounds_error=False): points outside [x[0], x[-1]] are NaN.
+    Returns (index, weight, inside).
+    """
+    inside = (x_target >= x_sorted[0]) & (x_target <= x_sorted[-1])
+    if method == "nearest":
+        midpoints = (x_sorted[1:] + x_sorted[:-1]) / 2.0
+        index = np.clip(np.searchsorted(midpoints, x_target, side="left"), 0, len(x_sorted) - 1)
+        return index, None, inside
+
+    hi = np.clip(np.searchsorted(x_sorted, x_target, side="left"), 1, len(x_sorted) - 1)
+    lo = hi - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight = (x_target - x_sorted[lo]) / (x_sorted[hi] - x_sorted[lo])
+    return lo, weight, inside
+
+
+def _apply(y_sorted, lookup, method, out):
+    index, weight, inside = lookup
+    if method == "nearest":
+        np.take(y_sorted, index, out=out, mode="clip")
+    else:
+        y_lo = y_sorted[index]
+        np.subtract(y_sorted[index + 1], y_lo, out=out)
+        out *= weight
+        out += y_lo
+    out[~inside] = np.nan
+
+
+def resample_onto_grid(x_target, sources, method="linear", dtype=None, block_size=BLOCK_SIZE):
+    """
+    Resample N series onto one shared target grid.
+
+    sources: list of (x, y) pairs; consecutive series that share the same
+    x array reuse the sort and the bracket indices. Returns one contiguous (N, len(x_target))
+    array in `dtype` (default: float32 if all y are float32, else float64);
+    x is always handled in float64. 'linear' and 'nearest' are computed block by block
+    over the target grid; 'cubic' uses a not-a-knot cubic spline (scipy),
+    like interp1d(kind='cubic').
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    if dtype is None:
+        dtype = float_dtype(*[y for _, y in sources])
+    x_target = np.asarray(x_target, dtype=np.float64)
+    result = np.empty((len(sources), len(x_target)), dtype=dtype)
+
+    current_x = None   # sources sharing this x array reuse sort order and brackets
+    for row, (x, y) in enumerate(sources):
+        if x is not current_x:
+            current_x = x
+            xs = np.asarray(x, dtype=np.float64)
+            order = np.argsort(xs, kind="stable") if len(xs) > 1 and np.any(xs[1:] < xs[:-1]) else None
+            x_sorted = xs if order is None else xs[order]
+            lookups = {}
+        y = np.asarray(y, dtype=dtype)
+        y_sorted = y if order is None else y[order]
+
+        if method == "cubic":
+            from scipy.interpolate import make_interp_spline
+            inside = (x_target >= x_sorted[0]) & (x_target <= x_sorted[-1])
+            result[row] = np.nan
+            result[row, inside] = make_interp_spline(x_sorted, y_sorted, k=3)(x_target[inside])
+            continue
+
+        buffer = np.empty(min(block_size, len(x_target)), dtype=dtype)
+        for start in range(0, len(x_target), block_size):
+            stop = min(start + block_size, len(x_target))
+            if start not in lookups:
+                lookups[start] = bracket(x_sorted, x_target[start:stop], method)
+            out = buffer[:stop - start]
+            _apply(y_sorted, lookups[start], method, out)
+            result[row, start:stop] = out
+
+    return result
@@ -0,0 +1,17 @@
+import pytest
+
+import convert_MTU_csv
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+def test_header_only_file_writes_header(tmp_path, chunked):
+    in_path = tmp_path / "header_only.csv"
+    out_path = tmp_path / "out.csv"
+    in_path.write_text(f"Time;{convert_MTU_csv.CRANK_COL_NAME};Pressure\n")
+
+    assert convert_MTU_csv.process_file(str(in_path), str(out_path), chunked=chunked)
+
+    columns = ["Time", convert_MTU_csv.CRANK_COL_NAME, "Pressure", convert_MTU_csv.NEW_CRANK_COL_NAME]
+    if convert_MTU_csv.UNWRAP_ALL_CYCLES:
+        columns.append(convert_MTU_csv.CYCLE_COL_NAME)
+    assert out_path.read_text().splitlines() == [convert_MTU_csv.OUTPUT_DELIM.join(columns)]